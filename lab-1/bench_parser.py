@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the schema-specialised record parser against the generic json path.
+Usage: python bench_parser.py [record_count]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from data_io.data_loader import DataLoader  # noqa: E402
+from data_io.fast_parser import fast_parser  # noqa: E402
+from models.records import RecordColumns  # noqa: E402
+
+
+def generate_file(path, count):
+    """Write `count` records shaped like generator.py's sample data."""
+    rng = random.Random(42)
+    records = []
+    for _ in range(count):
+        value = rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2),
+                            str(rng.randint(0, 100)), None])
+        records.append({"status": rng.choice(["ok", "bad", "error", "OK", "Bad"]), "value": value})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+
+
+def generic_columns(path):
+    with open(path, "r", encoding="utf-8") as f:
+        raw_data = json.load(f)
+    columns = RecordColumns()
+    for item in raw_data:
+        columns.append(*DataLoader._fields(item))
+    return columns
+
+
+def fast_columns(path):
+    with open(path, "rb") as f:
+        return fast_parser.parse_columns(f)
+
+
+def best_of(func, path, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.json"
+        generate_file(path, count)
+        assert len(fast_columns(path)) == count
+
+        generic = best_of(generic_columns, path)
+        fast = best_of(fast_columns, path)
+        print(f"records={count} size={path.stat().st_size / (1 << 20):.1f}MiB")
+        print(f"json.load + columns: {generic:.3f}s")
+        print(f"fast parser:         {fast:.3f}s")
+        print(f"speedup:             {generic / fast:.2f}x")
@@ -1,9 +1,22 @@
 import argparse
+import csv
 import datetime as dt
-from config.settings import settings
+import json
+import sys
+from functools import partial
+from typing import List, Optional, Tuple
+from config.settings import settings, parse_memory_size, parse_duration, settings_fingerprint, AnalysisContext
 from data_io.data_loader import DataLoader  # Changed from data_io.data_loader
 from core.filters import record_filter
-from core.calculator import calculator
+from core.calculator import calculator, aggregate_with_windows, WindowedAggregator
+from core.sketches import RecordSketches
+from core.sampling import estimate_statistics
+from core.delta import DeltaAnalyzer
+from core.topk import TopRecords, aggregate_with_top, format_top
+from data_io.chunk_store import ChunkStore
+from data_io.offset_index import TopIndex
+from data_io.planner import memory_planner
+from models.records import AnalysisResult
 
 
 def parse_arguments():
@@ -12,29 +25,179 @@ def parse_arguments():
     parser.add_argument("--thres", type=float, help="Threshold value")
     parser.add_argument("--all", action="store_true",
                         help="Include all records regardless of status")
-    return parser.parse_args()
+    parser.add_argument("--distinct", action="store_true",
+                        help="Estimate distinct values and statuses (HyperLogLog)")
+    parser.add_argument("--heavy-hitters", type=int, metavar="K",
+                        help="Report the K most frequent status spellings")
+    parser.add_argument("--max-memory", type=parse_memory_size, metavar="SIZE",
+                        help="Memory budget such as 512M or 2G; picks in-memory or streaming execution")
+    parser.add_argument("--top", type=int, metavar="K",
+                        help="Show the K qualifying records with the largest values and their raw source text")
+    parser.add_argument("--top-index", metavar="PATH",
+                        help="Remember --top results in PATH so repeat queries on an unchanged file skip the pass")
+    parser.add_argument("--window", type=parse_duration, metavar="DURATION",
+                        help="Also report statistics per event-time window, e.g. 1m or 1h")
+    parser.add_argument("--slide", type=parse_duration, metavar="DURATION",
+                        help="Start a new window every DURATION (sliding windows; default: tumbling)")
+    parser.add_argument("--lateness", type=parse_duration, default=0.0, metavar="DURATION",
+                        help="Accept records up to DURATION older than the newest one seen (default: 0)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print each window as soon as it closes")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--delta-cache", metavar="PATH",
+                       help="Cache per-chunk results in PATH and only re-parse chunks changed since the last run")
+    modes.add_argument("--sample", type=int, metavar="N",
+                       help="Estimate statistics from a random sample of N records")
+    modes.add_argument("--sample-fraction", type=float, metavar="P",
+                       help="Estimate statistics from a random sample of fraction P of the records")
+    args = parser.parse_args()
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be at least 1")
+    if args.sample_fraction is not None and not 0 < args.sample_fraction <= 1:
+        parser.error("--sample-fraction must be in (0, 1]")
+    if (args.sample is not None or args.sample_fraction is not None) and \
+            (args.distinct or args.heavy_hitters):
+        parser.error("--distinct/--heavy-hitters cannot be combined with sampling")
+    if args.delta_cache and (args.distinct or args.heavy_hitters):
+        parser.error("--distinct/--heavy-hitters cannot be combined with --delta-cache")
+    if args.max_memory is not None and args.max_memory < memory_planner.minimum_budget():
+        parser.error(f"--max-memory must be at least {-(-memory_planner.minimum_budget() // 1024)}K")
+    if args.heavy_hitters is not None and args.heavy_hitters < 1:
+        parser.error("--heavy-hitters must be at least 1")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    if args.top is not None and (args.delta_cache or args.sample is not None or args.sample_fraction is not None):
+        parser.error("--top cannot be combined with --delta-cache or sampling")
+    if args.top_index and args.top is None:
+        parser.error("--top-index requires --top")
+    if args.window is None and (args.slide is not None or args.lateness or args.stream):
+        parser.error("--slide/--lateness/--stream require --window")
+    if args.window is not None and (args.top is not None or args.delta_cache or
+                                    args.sample is not None or args.sample_fraction is not None):
+        parser.error("--window cannot be combined with --top, --delta-cache or sampling")
+    if (args.window is not None or args.top is not None or args.delta_cache) and args.max_memory is not None:
+        parser.error("--window/--top/--delta-cache cannot be combined with --max-memory")
+    if args.window is not None:
+        try:
+            WindowedAggregator(args.window, args.slide, args.lateness)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def run_top(loader: DataLoader, context: AnalysisContext, k: int,
+            sketches: Optional[RecordSketches] = None,
+            index_path: Optional[str] = None) -> Tuple[AnalysisResult, List[str]]:
+    """Aggregate in one pass that keeps the top k records, then seek to their raw text.
+
+    With `index_path` an unchanged file is answered from the stored offsets.
+    """
+    index = TopIndex(index_path) if index_path else None
+    data_path = context.data_path
+    cached = None
+    if index is not None and sketches is None and data_path.exists():
+        cached = index.lookup(data_path, settings_fingerprint(context), k)
+    if cached is not None:
+        result, entries = cached
+        return result, format_top(entries, loader.read_raw([offset for _, offset in entries]))
+
+    top = TopRecords(k)
+    result = aggregate_with_top(loader.iter_located(), top, context, sketches)
+    located = top.entries()
+    if any(offset is None for _, offset, _ in located):
+        # Fallback data has no source file to seek into
+        return result, format_top([(value, offset) for value, offset, _ in located],
+                                  [str(record) for _, _, record in located])
+
+    entries = [(value, offset) for value, offset, _ in located]
+    if index is not None:
+        index.store(data_path, settings_fingerprint(context), k, result, entries)
+    return result, format_top(entries, loader.read_raw([offset for _, offset in entries]))
 
 
 def main():
     args = parse_arguments()
 
-    # Update settings from command line
+    # Snapshot settings for this run, overridden from the command line
+    overrides = {}
     if args.file:
-        settings.data_path = args.file
+        overrides['data_path'] = args.file
     if args.thres is not None:
-        settings.default_threshold = args.thres
+        overrides['default_threshold'] = args.thres
     if args.all:
-        settings.filter_mode = "ALL"
+        overrides['filter_mode'] = "ALL"
+    if args.max_memory is not None:
+        overrides['max_memory'] = args.max_memory
+    context = settings.snapshot(**overrides)
 
-    # Load and process data
-    loader = DataLoader()
-    records = loader.load_records()
-    filtered_records = record_filter.filter_records(records)
-    result = calculator.calculate_statistics(filtered_records)
+    loader = DataLoader(context)
+    sketches = None
+    plan = None
+    delta_stats = None
+    top_lines = []
+    windows = []
+    aggregator = None
+    if args.delta_cache:
+        # Reuse cached results of chunks unchanged since the last run
+        with ChunkStore(args.delta_cache) as store:
+            result, delta_stats = DeltaAnalyzer(store, context).analyze()
+    elif args.sample is not None or args.sample_fraction is not None:
+        # Estimate from a random sample instead of a full pass
+        sample = loader.sample_records(args.sample, args.sample_fraction)
+        result = estimate_statistics(sample, partial(record_filter.matches, context=context))
+    else:
+        if args.distinct or args.heavy_hitters:
+            sketches = RecordSketches(heavy_hitters=args.heavy_hitters or 10)
+        try:
+            if args.window is not None:
+                # Per-window statistics over event time, printed as windows close with --stream
+                aggregator = WindowedAggregator(args.window, args.slide, args.lateness)
+                on_window = (lambda window: print(window.format_summary())) if args.stream else windows.append
+                # iter_located streams whole records, timestamps included, in every input format
+                result = aggregate_with_windows(loader.iter_located(), aggregator, on_window, context, sketches)
+            elif args.top is not None:
+                # One streaming pass that also keeps the largest records and their offsets
+                result, top_lines = run_top(loader, context, args.top, sketches, args.top_index)
+            elif args.max_memory is not None:
+                # Plan against the memory budget and aggregate batch by batch
+                try:
+                    plan = loader.plan()
+                except FileNotFoundError:
+                    plan = None
+                result = AnalysisResult(count=0, total=0.0, average=0.0)
+                for batch in loader.iter_batches(plan=plan):
+                    if sketches is not None:
+                        sketches.update(batch)
+                    filtered_records = record_filter.filter_records(batch, context=context)
+                    result = result.merge(calculator.calculate_statistics(filtered_records))
+            else:
+                # Load and process data
+                records = loader.load_records()
+                if sketches is not None:
+                    # Profile the input as loaded, before the filter drops any spelling
+                    sketches.update(records)
+                filtered_records = record_filter.filter_records(records, context=context)
+                result = calculator.calculate_statistics(filtered_records)
+        except (json.JSONDecodeError, csv.Error) as e:
+            # load_records falls back on its own; the streaming passes may already have used
+            # part of the input, so they stop with an error instead
+            sys.exit(f"Error: cannot parse {context.data_path}: {e}")
 
     # Output results
     timestamp = dt.datetime.now().strftime("%Y/%m/%d-%H:%M:%S")
     print(result.format_summary(timestamp))
+    if sketches is not None:
+        print(sketches.format_summary(args.heavy_hitters))
+    if plan is not None:
+        print(plan.format_summary())
+    if delta_stats is not None:
+        print(delta_stats.format_summary())
+    for line in top_lines:
+        print(line)
+    for window in windows:
+        print(window.format_summary())
+    if aggregator is not None:
+        print(aggregator.format_summary())
 
     return result
 
@@ -1,8 +1,55 @@
+import dataclasses
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from utils import logger
 
+_SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_memory_size(text: str) -> int:
+    """Parse a memory size such as '512M', '2G' or '1048576' into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid memory size: {text!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as '90', '15s', '5m', '1h' or '1d' into seconds."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+
+
+@dataclass(frozen=True)
+class AnalysisContext:
+    """Immutable per-run snapshot of the settings an analysis uses.
+
+    Pass one to DataLoader, RecordFilter and the other components to run
+    analyses concurrently without touching the global `settings`.
+    """
+    data_path: Path
+    encoding: str = 'utf-8'
+    default_threshold: float = 0
+    filter_mode: str = 'OK'
+    max_memory: Optional[int] = None
+    fast_parser: bool = True
+
+    def replace(self, **changes: Any) -> 'AnalysisContext':
+        return dataclasses.replace(self, **changes)
+
+
+def settings_fingerprint(config) -> str:
+    """Identify the settings that decide which records qualify and how they decode."""
+    return f"{config.filter_mode}|{config.default_threshold!r}|{config.encoding}"
+
 
 class Settings:
     def __init__(self):
@@ -10,6 +57,8 @@ class Settings:
         self.encoding = 'utf-8'
         self.default_threshold = 0
         self.filter_mode = 'OK'
+        self.max_memory = None  # bytes; None keeps the plain in-memory load
+        self.fast_parser = True  # schema-specialised parser for columnar loads
 
     def update_from_file(self, config_path: Path)-> None:
         if config_path.exists():
@@ -29,6 +78,16 @@ class Settings:
             self.default_threshold = args['threshold']
         if 'filter_mode' in args:
             self.filter_mode = args['filter_mode']
+        if 'max_memory' in args:
+            self.max_memory = parse_memory_size(args['max_memory'])
+
+    def snapshot(self, **overrides: Any) -> AnalysisContext:
+        """Freeze the current settings, with optional overrides, into an AnalysisContext."""
+        values = {field.name: getattr(self, field.name)
+                  for field in dataclasses.fields(AnalysisContext)}
+        values.update(overrides)
+        values['data_path'] = Path(values['data_path'])
+        return AnalysisContext(**values)
 
 
 settings = Settings()
\ No newline at end of file
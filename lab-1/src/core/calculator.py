@@ -1,5 +1,111 @@
-from typing import List
-from models.records import Record, AnalysisResult
+import collections
+import math
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from config.settings import AnalysisContext
+from core.filters import record_filter
+from core.sketches import RecordSketches
+from data_io.planner import memory_planner
+from models.records import Record, AnalysisResult, WindowedAnalysisResult
+
+
+class WindowedAggregator:
+    """Count and total per event-time window, emitted as each window closes.
+
+    Time is cut into slots of `slide` seconds and a window spans `size`
+    seconds, i.e. size / slide consecutive slots (size == slide gives
+    tumbling windows). Records are added to their slot in a ring buffer of
+    open slots; a slot closes once the latest timestamp seen has passed its
+    end by `allowed_lateness`. Closed slots move into a second ring holding
+    one window's worth, with running sums, so each record and each emitted
+    window cost O(1). Records older than the oldest open slot are counted
+    in `late` and dropped; records without a timestamp or numeric value are
+    counted in `skipped`. Empty windows are not emitted.
+    """
+
+    def __init__(self, size: float, slide: float = None, allowed_lateness: float = 0.0):
+        if slide is None:
+            slide = size
+        if size <= 0 or slide <= 0 or allowed_lateness < 0:
+            raise ValueError("window size and slide must be positive and lateness non-negative")
+        slots = size / slide
+        if abs(slots - round(slots)) > 1e-9:
+            raise ValueError("window size must be a multiple of the slide")
+        self.size = size
+        self.slide = slide
+        self.allowed_lateness = allowed_lateness
+        self.late = 0
+        self.skipped = 0
+        self._window_slots = int(round(slots))
+        self._open = [[0, 0.0] for _ in range(int(math.ceil(allowed_lateness / slide)) + 2)]
+        self._open_count = 0
+        self._closed = collections.deque()
+        self._window_count = 0
+        self._window_total = 0.0
+        self._next_slot = None  # oldest open slot
+        self._max_timestamp = None
+
+    def format_summary(self) -> str:
+        return f"windows late={self.late} skipped={self.skipped}"
+
+    def add(self, record: Record) -> List[WindowedAnalysisResult]:
+        """Add one record and return the windows it closed, oldest first."""
+        value = record.get_numeric_value()
+        if record.timestamp is None or value is None:
+            self.skipped += 1
+            return []
+        slot = math.floor(record.timestamp / self.slide)
+        if self._next_slot is None:
+            self._next_slot = math.floor((record.timestamp - self.allowed_lateness) / self.slide)
+        elif slot < self._next_slot:
+            self.late += 1
+            return []
+
+        if self._max_timestamp is None or record.timestamp > self._max_timestamp:
+            self._max_timestamp = record.timestamp
+        closed = self._close_until(math.floor((self._max_timestamp - self.allowed_lateness) / self.slide))
+        accumulator = self._open[slot % len(self._open)]
+        accumulator[0] += 1
+        accumulator[1] += value
+        self._open_count += 1
+        return closed
+
+    def flush(self) -> List[WindowedAnalysisResult]:
+        """Close every remaining window, e.g. at the end of the input."""
+        if self._next_slot is None:
+            return []
+        return self._close_until(self._next_slot + len(self._open) + self._window_slots)
+
+    def _close_until(self, slot: int) -> List[WindowedAnalysisResult]:
+        """Close the open slots before `slot`, emitting the windows ending with them."""
+        windows = []
+        while self._next_slot < slot:
+            if self._open_count == 0 and self._window_count == 0:
+                # Nothing buffered: skip the gap instead of walking empty slots.
+                self._closed.clear()
+                self._next_slot = slot
+                break
+            accumulator = self._open[self._next_slot % len(self._open)]
+            count, total = accumulator
+            accumulator[0], accumulator[1] = 0, 0.0
+            self._open_count -= count
+
+            self._closed.append((count, total))
+            self._window_count += count
+            self._window_total += total
+            if len(self._closed) > self._window_slots:
+                old_count, old_total = self._closed.popleft()
+                self._window_count -= old_count
+                self._window_total = self._window_total - old_total if self._window_count else 0.0
+
+            self._next_slot += 1
+            if self._window_count:
+                end = self._next_slot * self.slide
+                windows.append(WindowedAnalysisResult(
+                    count=self._window_count, total=self._window_total,
+                    average=self._window_total / self._window_count, start=end - self.size, end=end))
+        return windows
+
+
 class StatisticsCalculator:
     @staticmethod
     def calculate_statistics(records: List[Record]) -> AnalysisResult:
@@ -25,5 +131,59 @@ class StatisticsCalculator:
             average=average
         )
 
+    @staticmethod
+    def calculate_windows(records: Iterable[Record], size: float, slide: float = None,
+                          allowed_lateness: float = 0.0) -> Iterator[WindowedAnalysisResult]:
+        """Yield per-window statistics of timestamped records as each window closes."""
+        aggregator = WindowedAggregator(size, slide, allowed_lateness)
+        for record in records:
+            yield from aggregator.add(record)
+        yield from aggregator.flush()
+
+
+def aggregate_located(located: Iterable[Tuple[Optional[int], Record]], context: AnalysisContext = None,
+                      sketches: Optional[RecordSketches] = None,
+                      on_match: Callable[[Optional[int], Record], None] = None,
+                      batch_size: int = memory_planner.DEFAULT_BATCH_SIZE) -> AnalysisResult:
+    """Filter and aggregate (offset, record) pairs in one pass, batch by batch.
+
+    `sketches` see every record before filtering; `on_match` is called with
+    the offset and record of each qualifying record.
+    """
+    result = AnalysisResult(count=0, total=0.0, average=0.0)
+    batch = []
+    for offset, record in located:
+        if sketches is not None:
+            sketches.add(record)
+        if not record_filter.matches(record, context=context):
+            continue
+        if on_match is not None:
+            on_match(offset, record)
+        batch.append(record)
+        if len(batch) == batch_size:
+            result = result.merge(StatisticsCalculator.calculate_statistics(batch))
+            batch = []
+    if batch:
+        result = result.merge(StatisticsCalculator.calculate_statistics(batch))
+    return result
+
+
+def aggregate_with_windows(located: Iterable[Tuple[Optional[int], Record]], aggregator: WindowedAggregator,
+                           on_window: Callable[[WindowedAnalysisResult], None],
+                           context: AnalysisContext = None, sketches: Optional[RecordSketches] = None,
+                           batch_size: int = memory_planner.DEFAULT_BATCH_SIZE) -> AnalysisResult:
+    """Filter and aggregate in one pass that also feeds qualifying records through `aggregator`.
+
+    Each window is handed to `on_window` as it closes, the rest after the last record.
+    """
+    def add(_, record: Record) -> None:
+        for window in aggregator.add(record):
+            on_window(window)
+
+    result = aggregate_located(located, context, sketches, add, batch_size)
+    for window in aggregator.flush():
+        on_window(window)
+    return result
+
 
 calculator = StatisticsCalculator()
\ No newline at end of file
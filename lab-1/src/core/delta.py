@@ -0,0 +1,114 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+from config.settings import settings, AnalysisContext, settings_fingerprint
+from core.calculator import calculator
+from core.filters import record_filter
+from data_io.chunk_store import ChunkStore
+from data_io.chunking import ContentChunker
+from data_io.data_loader import DataLoader, detect_format
+from data_io.spill import SpilledRecords
+from models.records import AnalysisResult
+from utils.logger import logger
+
+
+@dataclass
+class DeltaStats:
+    """How much of a delta run was served from cached partials.
+
+    `fallback` says why the run fell back to a plain full load, if it did.
+    """
+    chunks: int = 0
+    reused: int = 0
+    fallback: Optional[str] = None
+
+    def format_summary(self) -> str:
+        if self.fallback is not None:
+            return f"delta fallback=full-load ({self.fallback})"
+        return f"delta chunks={self.chunks} reused={self.reused} parsed={self.chunks - self.reused}"
+
+
+class DeltaAnalyzer:
+    """Analyze a file chunk by chunk, reusing partial results of unchanged chunks.
+
+    The file is split into content-defined chunks; each chunk's result is
+    stored under its SHA-256 and the filter settings. A rerun after a small
+    in-place edit only parses the chunks around the edit.
+    """
+
+    def __init__(self, store: ChunkStore, context: AnalysisContext = None,
+                 chunker: ContentChunker = None):
+        self.store = store
+        self.context = context
+        self.chunker = chunker or ContentChunker()
+        self.loader = DataLoader(context)
+
+    @property
+    def _config(self):
+        return self.context if self.context is not None else settings
+
+    def analyze(self, file_path: Path = None) -> Tuple[AnalysisResult, DeltaStats]:
+        """Analyze `file_path`; CSV/TSV and unreadable files get a plain full load."""
+        if file_path is None:
+            file_path = self._config.data_path
+        file_format = detect_format(file_path)
+        if file_format not in ('json', 'ndjson'):
+            # Delimited chunks would depend on the header in the first one.
+            return self._full_result(file_path), DeltaStats(fallback=f"{file_format} input is not chunked")
+        stats = DeltaStats()
+        try:
+            result = self._analyze_chunks(Path(file_path), stats)
+        except FileNotFoundError:
+            return self._full_result(file_path), DeltaStats(fallback="file not found")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning(f"Delta cache not used for {file_path}: {e}")
+            return self._full_result(file_path), DeltaStats(fallback="chunk could not be parsed")
+        finally:
+            self.store.commit()
+        return result, stats
+
+    def _full_result(self, file_path: Path) -> AnalysisResult:
+        records = self.loader.load_records(file_path)
+        try:
+            filtered_records = record_filter.filter_records(records, context=self.context)
+            return calculator.calculate_statistics(filtered_records)
+        finally:
+            if isinstance(records, SpilledRecords):
+                records.close()
+
+    def _analyze_chunks(self, file_path: Path, stats: DeltaStats) -> AnalysisResult:
+        file_format = detect_format(file_path)
+        fingerprint = settings_fingerprint(self._config)
+        result = AnalysisResult(count=0, total=0.0, average=0.0)
+        with open(file_path, 'rb') as f:
+            chunks = self.chunker.iter_chunks(f, file_format)
+            # Look one chunk ahead so the last chunk is known when parsed.
+            chunk = next(chunks, b'')
+            first = True
+            while True:
+                following = next(chunks, None)
+                result = result.merge(self._chunk_result(chunk, first, following is None,
+                                                         file_format, fingerprint, stats))
+                if following is None:
+                    return result
+                chunk, first = following, False
+
+    def _chunk_result(self, chunk: bytes, first: bool, last: bool, file_format: str,
+                      fingerprint: str, stats: DeltaStats) -> AnalysisResult:
+        stats.chunks += 1
+        digest = hashlib.sha256(chunk).hexdigest()
+        partial = self.store.get(digest, fingerprint)
+        if partial is not None:
+            if file_format != 'ndjson':
+                # Cached chunks still have to sit at a valid place in the array.
+                self.loader.check_chunk_edges(chunk, first, last)
+            stats.reused += 1
+            return partial
+
+        records = self.loader.parse_chunk(chunk, first, last, file_format)
+        filtered_records = record_filter.filter_records(records, context=self.context)
+        partial = calculator.calculate_statistics(filtered_records)
+        self.store.put(digest, fingerprint, partial)
+        return partial
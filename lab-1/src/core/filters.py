@@ -1,24 +1,36 @@
 from typing import List
 from models.records import Record
-from config.settings import settings
+from config.settings import settings, AnalysisContext
 class RecordFilter:
-    def filter_records(self, records: List[Record], threshold: float = None) -> List[Record]:
+    def filter_records(self, records: List[Record], threshold: float = None,
+                       context: AnalysisContext = None) -> List[Record]:
+        config = context if context is not None else settings
         if threshold is None:
-            threshold = settings.default_threshold
+            threshold = config.default_threshold
 
         filtered = []
         for record in records:
-            if self._should_include(record, threshold):
+            if self._should_include(record, threshold, config.filter_mode):
                 filtered.append(record)
         return filtered
 
+    def matches(self, record: Record, threshold: float = None,
+                context: AnalysisContext = None) -> bool:
+        """Check a single record against the filter."""
+        config = context if context is not None else settings
+        if threshold is None:
+            threshold = config.default_threshold
+        return self._should_include(record, threshold, config.filter_mode)
+
     @staticmethod
-    def _should_include(record: Record, threshold: float) -> bool:
-        if settings.filter_mode == "ALL":
+    def _should_include(record: Record, threshold: float, filter_mode: str = None) -> bool:
+        if filter_mode is None:
+            filter_mode = settings.filter_mode
+        if filter_mode == "ALL":
             return record.get_numeric_value() is not None
 
         return record.is_valid(threshold)
 
 
 # Singleton instance
-record_filter = RecordFilter()
\ No newline at end of file
+record_filter = RecordFilter()
@@ -0,0 +1,166 @@
+import collections
+import dataclasses
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from config.settings import AnalysisContext
+from core.calculator import calculator
+from core.filters import record_filter
+from core.sketches import RecordSketches
+from data_io.data_loader import DataLoader
+from data_io.planner import memory_planner
+from models.records import AnalysisResult, Record
+
+Batches = Iterator[List[Record]]
+
+
+def _map_batch(func: Callable[[Record], Record], batch: List[Record]) -> List[Record]:
+    return [func(record) for record in batch]
+
+
+def _filter_batch(predicate: Callable[[Record], bool], batch: List[Record]) -> List[Record]:
+    return [record for record in batch if predicate(record)]
+
+
+def _batched(records: Iterable[Record], batch_size: int) -> Batches:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _profile_batches(sketches: RecordSketches, batches: Batches) -> Batches:
+    for batch in batches:
+        sketches.update(batch)
+        yield batch
+
+
+def _file_batches(loader: DataLoader, file_path: Optional[Path], batch_size: Optional[int]) -> Batches:
+    try:
+        plan = loader.plan(file_path)
+    except FileNotFoundError:
+        plan = None
+    if plan is not None and batch_size is not None:
+        plan = dataclasses.replace(plan, batch_size=batch_size)
+    yield from loader.iter_batches(file_path, plan)
+
+
+def _run_pooled(func: Callable[[List[Record]], List[Record]], batches: Batches,
+                workers: int, processes: bool, queue_size: Optional[int]) -> Batches:
+    """Apply `func` to batches in a pool, keeping at most `queue_size` in flight.
+
+    Results come back in input order. Upstream batches are only pulled while
+    the queue has room, so a slow stage holds back the source.
+    """
+    if queue_size is None:
+        queue_size = 2 * workers
+    pool: Executor = ProcessPoolExecutor(workers) if processes else ThreadPoolExecutor(workers)
+    pending = collections.deque()
+    try:
+        for batch in batches:
+            pending.append(pool.submit(func, batch))
+            if len(pending) >= queue_size:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown()
+
+
+class Pipeline:
+    """Lazy record pipeline: source -> decode -> filter -> map -> aggregate/sink.
+
+    Every stage is a generator over fixed-size batches of records, so nothing
+    runs until the pipeline is consumed and peak memory follows the batch
+    size rather than the dataset. Builder methods return a new pipeline and
+    leave the original untouched. Batch stages can run in a thread or
+    process pool (`workers`) with a bounded queue of in-flight batches.
+    """
+
+    def __init__(self, source: Callable[[], Batches], context: AnalysisContext = None,
+                 stages: List[Callable[[Batches], Batches]] = None):
+        self.source = source
+        self.context = context
+        self.stages = stages or []
+
+    @classmethod
+    def from_file(cls, file_path: Path = None, context: AnalysisContext = None,
+                  batch_size: int = None) -> 'Pipeline':
+        """Read and decode records from a file, in any format DataLoader supports.
+
+        Without `batch_size` the batches follow the loader's plan, which
+        honours the context's `max_memory`.
+        """
+        loader = DataLoader(context)
+        return cls(partial(_file_batches, loader, file_path, batch_size), context)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Record], context: AnalysisContext = None,
+                     batch_size: int = memory_planner.DEFAULT_BATCH_SIZE) -> 'Pipeline':
+        """Batch an existing iterable of records; it is consumed once."""
+        return cls(partial(_batched, records, batch_size), context)
+
+    def then(self, stage: Callable[[Batches], Batches]) -> 'Pipeline':
+        """Append a custom stage transforming the stream of batches."""
+        return Pipeline(self.source, self.context, self.stages + [stage])
+
+    def map_batches(self, func: Callable[[List[Record]], List[Record]], workers: int = None,
+                    processes: bool = False, queue_size: int = None) -> 'Pipeline':
+        """Apply `func` to each batch, in a pool of `workers` if given.
+
+        With `processes` the function and batches must be picklable.
+        """
+        if workers is None:
+            return self.then(partial(map, func))
+        return self.then(partial(_run_pooled, func, workers=workers, processes=processes,
+                                 queue_size=queue_size))
+
+    def filter(self, threshold: float = None, predicate: Callable[[Record], bool] = None,
+               **pool_options: Any) -> 'Pipeline':
+        """Keep records passing `predicate`, by default the configured record filter."""
+        if predicate is None:
+            func = partial(record_filter.filter_records, threshold=threshold, context=self.context)
+        else:
+            func = partial(_filter_batch, predicate)
+        return self.map_batches(func, **pool_options)
+
+    def map(self, func: Callable[[Record], Record], **pool_options: Any) -> 'Pipeline':
+        """Transform each record with `func`."""
+        return self.map_batches(partial(_map_batch, func), **pool_options)
+
+    def profile(self, sketches: RecordSketches) -> 'Pipeline':
+        """Feed every record reaching this stage to `sketches`, passing batches through.
+
+        Place it before `filter` to profile the input as loaded.
+        """
+        return self.then(partial(_profile_batches, sketches))
+
+    def batches(self) -> Batches:
+        """Run the pipeline lazily, yielding the final batches."""
+        stream = self.source()
+        for stage in self.stages:
+            stream = stage(stream)
+        return (batch for batch in stream if batch)
+
+    def __iter__(self) -> Iterator[Record]:
+        for batch in self.batches():
+            yield from batch
+
+    def aggregate(self) -> AnalysisResult:
+        """Compute count, total and average over the whole stream, batch by batch."""
+        result = AnalysisResult(count=0, total=0.0, average=0.0)
+        for batch in self.batches():
+            result = result.merge(calculator.calculate_statistics(batch))
+        return result
+
+    def sink(self, func: Callable[[List[Record]], Any]) -> None:
+        """Hand each final batch to `func`."""
+        for batch in self.batches():
+            func(batch)
@@ -0,0 +1,116 @@
+import math
+import random
+from typing import Any, Callable, Iterable, List, Optional
+from models.records import Record, RecordSample, SampledAnalysisResult
+
+# Two-sided normal quantiles for the supported confidence levels.
+_Z_SCORES = {0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+class ReservoirSampler:
+    """Uniform fixed-size sample of a stream (Algorithm L: O(1) per item, few RNG calls)."""
+
+    def __init__(self, size: int, rng: random.Random = None):
+        if size < 1:
+            raise ValueError("sample size must be at least 1")
+        self.size = size
+        self.seen = 0
+        self.items: List[Any] = []
+        self._rng = rng or random.Random()
+        self._w = 1.0
+        self._next = size
+
+    def add(self, item: Any) -> None:
+        self.seen += 1
+        if self.seen <= self.size:
+            self.items.append(item)
+            if self.seen == self.size:
+                self._advance()
+        elif self.seen == self._next:
+            self.items[self._rng.randrange(self.size)] = item
+            self._advance()
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.add(item)
+
+    def _advance(self) -> None:
+        self._w *= math.exp(math.log(1.0 - self._rng.random()) / self.size)
+        skip = math.floor(math.log(1.0 - self._rng.random()) / math.log(1.0 - self._w))
+        self._next += skip + 1
+
+    def to_sample(self) -> RecordSample:
+        return RecordSample(records=list(self.items),
+                            weights=[float(self.seen)] * len(self.items),
+                            population=self.seen)
+
+
+def estimate_statistics(sample: RecordSample, qualifies: Callable[[Record], bool],
+                        confidence: float = 0.95) -> SampledAnalysisResult:
+    """Estimate count, total and average of qualifying records with confidence intervals.
+
+    Each draw i contributes weight_i * y_i (Hansen-Hurwitz); uniform samples
+    without replacement additionally get the finite population correction.
+    """
+    z = _Z_SCORES.get(confidence)
+    if z is None:
+        raise ValueError(f"Unsupported confidence level: {confidence}")
+
+    n = len(sample.records)
+    if n == 0:
+        return SampledAnalysisResult(count=0, total=0.0, average=0.0, confidence=confidence)
+
+    sizes, counts, totals, values = [], [], [], []
+    for record, weight in zip(sample.records, sample.weights):
+        value = None
+        if record is not None and qualifies(record):
+            value = record.get_numeric_value()
+        sizes.append(weight if record is not None else 0.0)
+        counts.append(weight if value is not None else 0.0)
+        totals.append(weight * value if value is not None else 0.0)
+        values.append(value)
+
+    population = sample.population if sample.population is not None else _mean(sizes)
+    count = _mean(counts)
+    total = _mean(totals)
+    average = total / count if count else 0.0
+
+    fpc = 1.0
+    if sample.population:
+        fpc = max(0.0, 1.0 - n / sample.population)
+    # Linearised residuals of the ratio estimator total / count.
+    residuals = [c * (v - average) if v is not None else 0.0 for c, v in zip(counts, values)]
+
+    return SampledAnalysisResult(
+        count=count,
+        total=total,
+        average=average,
+        count_margin=z * _standard_error(counts, fpc),
+        total_margin=z * _standard_error(totals, fpc),
+        average_margin=z * _standard_error(residuals, fpc) / count if count else 0.0,
+        sample_size=n,
+        population=population,
+        confidence=confidence
+    )
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+
+def _standard_error(values: List[float], fpc: float) -> float:
+    n = len(values)
+    if fpc == 0.0:
+        return 0.0
+    if n < 2:
+        return math.inf
+    mean = _mean(values)
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return math.sqrt(variance * fpc / n)
+
+
+def sample_size_for(fraction: float, population: Optional[float]) -> int:
+    """Translate a sampling fraction into a draw count (at least one draw)."""
+    if not 0.0 < fraction <= 1.0:
+        raise ValueError("sample fraction must be in (0, 1]")
+    return max(1, math.ceil(fraction * (population or 0)))
@@ -0,0 +1,158 @@
+import hashlib
+import math
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+from models.records import Record
+
+
+def _hash64(item: Any) -> int:
+    """Stable 64-bit hash of an item (identical across processes and workers)."""
+    digest = hashlib.blake2b(repr(item).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HyperLogLog:
+    """Approximate distinct counter using a fixed number of registers."""
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self._m = 1 << precision
+        self._registers = bytearray(self._m)
+
+    def add(self, item: Any) -> None:
+        x = _hash64(item)
+        index = x >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = x & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        registers = self._registers
+        for i, rank in enumerate(other._registers):
+            if rank > registers[i]:
+                registers[i] = rank
+
+    def count(self) -> int:
+        m = self._m
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(2.0 ** -rank for rank in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """Heavy-hitters tracker keeping at most `capacity` counters."""
+
+    def __init__(self, capacity: int = 10):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        counts = self._counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self._errors[item] = 0
+        else:
+            victim = min(counts, key=counts.get)
+            floor = counts.pop(victim)
+            del self._errors[victim]
+            counts[item] = floor + count
+            self._errors[item] = floor
+
+    def merge(self, other: 'SpaceSaving') -> None:
+        """Merge another tracker into this one; overestimates stay bounded."""
+        self_floor = self._floor()
+        other_floor = other._floor()
+        merged_counts = {}
+        merged_errors = {}
+        for item in set(self._counts) | set(other._counts):
+            merged_counts[item] = (self._counts.get(item, self_floor)
+                                   + other._counts.get(item, other_floor))
+            merged_errors[item] = (self._errors.get(item, self_floor)
+                                   + other._errors.get(item, other_floor))
+
+        keep = sorted(merged_counts, key=merged_counts.get, reverse=True)[:self.capacity]
+        self._counts = {item: merged_counts[item] for item in keep}
+        self._errors = {item: merged_errors[item] for item in keep}
+
+    def top(self, n: int = None) -> List[Tuple[Hashable, int]]:
+        """Return (item, estimated count) pairs, most frequent first."""
+        ranked = sorted(self._counts.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def error(self, item: Hashable) -> int:
+        """Upper bound on how much the count for `item` is overestimated."""
+        return self._errors.get(item, self._floor())
+
+    def _floor(self) -> int:
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+
+class RecordSketches:
+    """Fixed-memory profile of a record stream: distinct values/statuses and top statuses.
+
+    The status tracker keeps several times more counters than the
+    `heavy_hitters` reported, so a long tail of rare spellings does not
+    pile up on the last reported slot.
+    """
+    COUNTERS_PER_HITTER = 10
+    MIN_COUNTERS = 100
+
+    def __init__(self, precision: int = 14, heavy_hitters: int = 10):
+        if heavy_hitters < 1:
+            raise ValueError("heavy_hitters must be at least 1")
+        self.distinct_values = HyperLogLog(precision)
+        self.distinct_statuses = HyperLogLog(precision)
+        self.top_statuses = SpaceSaving(max(self.COUNTERS_PER_HITTER * heavy_hitters, self.MIN_COUNTERS))
+
+    def add(self, record: Record) -> None:
+        # Count 86, 86.0 and "86" as one value; keep non-numeric values as they are
+        numeric_value = record.get_numeric_value()
+        self.distinct_values.add(record.value if numeric_value is None else numeric_value)
+        self.distinct_statuses.add(record.status)
+        self.top_statuses.add(record.status)
+
+    def update(self, records: Iterable[Record]) -> None:
+        """Add every record of `records`."""
+        for record in records:
+            self.add(record)
+
+    def merge(self, other: 'RecordSketches') -> None:
+        self.distinct_values.merge(other.distinct_values)
+        self.distinct_statuses.merge(other.distinct_statuses)
+        self.top_statuses.merge(other.top_statuses)
+
+    def format_summary(self, top: int = None) -> str:
+        lines = [f"distinct_values~{self.distinct_values.count()} "
+                 f"distinct_statuses~{self.distinct_statuses.count()}"]
+        if top:
+            # Counts may be overestimated by up to the shown error
+            hitters = " ".join(self._format_hitter(status, count) for status, count in self.top_statuses.top(top))
+            lines.append(f"top_statuses: {hitters}")
+        return "\n".join(lines)
+
+    def _format_hitter(self, status: str, count: int) -> str:
+        error = self.top_statuses.error(status)
+        return f"{status!r}={count}" if not error else f"{status!r}={count}±{error}"
@@ -0,0 +1,57 @@
+import heapq
+from typing import Iterable, List, Optional, Tuple
+from config.settings import AnalysisContext
+from core.calculator import aggregate_located
+from core.sketches import RecordSketches
+from data_io.planner import memory_planner
+from models.records import AnalysisResult, Record
+
+
+class TopRecords:
+    """The k records with the largest numeric values, kept in a bounded min-heap.
+
+    Each record is stored with its source byte offset so its raw text can be
+    fetched afterwards. Ties keep the record seen first.
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self._heap: List[Tuple[float, int, Optional[int], Record]] = []
+        self._seen = 0
+
+    def add(self, record: Record, offset: Optional[int] = None) -> None:
+        value = record.get_numeric_value()
+        if value is None:
+            return
+        self._seen += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (value, -self._seen, offset, record))
+        elif value > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (value, -self._seen, offset, record))
+
+    def entries(self) -> List[Tuple[float, Optional[int], Record]]:
+        """(value, offset, record) from largest to smallest value."""
+        return [(value, offset, record)
+                for value, _, offset, record in sorted(self._heap, reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def format_top(entries: List[Tuple[float, Optional[int]]], raws: List[str]) -> List[str]:
+    """One output line per (value, offset) entry with its raw source text."""
+    return [f"top[{rank}] value={value:.2f} offset={offset if offset is not None else '-'} {raw}"
+            for rank, ((value, offset), raw) in enumerate(zip(entries, raws), 1)]
+
+
+def aggregate_with_top(located: Iterable[Tuple[Optional[int], Record]], top: TopRecords,
+                       context: AnalysisContext = None, sketches: Optional[RecordSketches] = None,
+                       batch_size: int = memory_planner.DEFAULT_BATCH_SIZE) -> AnalysisResult:
+    """Filter and aggregate located records in one pass, offering each qualifying record to `top`.
+
+    `sketches` see every loaded record, before filtering.
+    """
+    return aggregate_located(located, context, sketches, lambda offset, record: top.add(record, offset),
+                             batch_size)
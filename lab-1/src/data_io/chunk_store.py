@@ -0,0 +1,52 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional
+from models.records import AnalysisResult
+
+
+class ChunkStore:
+    """Local SQLite store of per-chunk partial results.
+
+    Partials are keyed by the chunk's content hash and a fingerprint of the
+    settings that produced them, so one store serves any number of files
+    and thresholds.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS partials ("
+            " digest TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " count INTEGER NOT NULL, total REAL NOT NULL,"
+            " PRIMARY KEY (digest, fingerprint))"
+        )
+
+    def get(self, digest: str, fingerprint: str) -> Optional[AnalysisResult]:
+        row = self._conn.execute(
+            "SELECT count, total FROM partials WHERE digest = ? AND fingerprint = ?",
+            (digest, fingerprint)
+        ).fetchone()
+        if row is None:
+            return None
+        count, total = row
+        return AnalysisResult(count=count, total=total, average=total / count if count else 0.0)
+
+    def put(self, digest: str, fingerprint: str, result: AnalysisResult) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO partials (digest, fingerprint, count, total) VALUES (?, ?, ?, ?)",
+            (digest, fingerprint, result.count, result.total)
+        )
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,89 @@
+import re
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Candidate cut points: right after a top-level record's closing brace (JSON
+# arrays) or after a newline (NDJSON). Cuts elsewhere would split a record.
+# In JSON only braces outside strings count. Tokens are a whole object without
+# nested objects (most records, matched in one step), a string, a lone quote
+# starting a string cut off by the end of the buffer, or a single brace.
+_JSON_TOKEN = re.compile(rb'(?P<object>\{[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*\})'
+                         rb'|(?P<string>"[^"\\]*(?:\\.[^"\\]*)*")|(?P<quote>")|(?P<brace>[{}])')
+_JSON_SEPARATOR = re.compile(rb'[ \t\n\r]*(,)?')
+_NDJSON_CANDIDATE = re.compile(rb'\n')
+
+
+class ContentChunker:
+    """Split a record file into content-defined chunks.
+
+    A candidate cut becomes a chunk boundary when the hash of the WINDOW bytes
+    before it, modulo avg_size, is below the distance to the previous
+    candidate, which gives each byte about a 1 / avg_size chance of ending a
+    chunk whatever the record length. Boundaries depend only on nearby
+    content: an edit in the middle of a file changes the chunks around it and
+    leaves every other chunk byte-for-byte identical. Chunks are kept between
+    avg_size / 4 and avg_size * 4 bytes where the record layout allows.
+    """
+    WINDOW = 256
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self, avg_size: int = 1 << 16):
+        if avg_size < 64 or avg_size & (avg_size - 1):
+            raise ValueError("avg_size must be a power of two of at least 64")
+        self.mask = avg_size - 1
+        self.min_size = avg_size // 4
+        self.max_size = avg_size * 4
+
+    def iter_chunks(self, f: BinaryIO, file_format: str = 'json') -> Iterator[bytes]:
+        buf = b''
+        pos = previous = depth = 0
+        eof = False
+        while not eof:
+            block = f.read(self.BLOCK_SIZE)
+            eof = not block
+            buf += block
+            while True:
+                if file_format == 'ndjson':
+                    m = _NDJSON_CANDIDATE.search(buf, pos)
+                    cut, pos = (m.end(), m.end()) if m is not None else (None, len(buf))
+                else:
+                    cut, pos, depth = self._json_candidate(buf, pos, depth, eof)
+                if cut is None:
+                    break
+                if cut >= self.max_size or (cut >= self.min_size and
+                        zlib.crc32(buf[max(0, cut - self.WINDOW):cut]) & self.mask < cut - previous):
+                    yield buf[:cut]
+                    buf = buf[cut:]
+                    pos = previous = 0
+                else:
+                    previous = cut
+        if buf:
+            yield buf
+
+    @staticmethod
+    def _json_candidate(buf: bytes, pos: int, depth: int,
+                        eof: bool) -> Tuple[Optional[int], int, int]:
+        """Find the next cut after a top-level record followed by a comma.
+
+        Scans from `pos` at brace nesting `depth` and returns (cut, pos,
+        depth) to resume from; cut is None when the buffer runs out first,
+        in which case scanning resumes before any undecided token.
+        """
+        for m in _JSON_TOKEN.finditer(buf, pos):
+            kind = m.lastgroup
+            if kind == 'brace' and buf[m.start()] == 0x7b:  # '{'
+                depth += 1
+            elif kind in ('object', 'brace'):
+                # A lone '}' closes a level; a whole object opens and closes its own.
+                closed = kind == 'brace'
+                if closed:
+                    depth -= 1
+                if depth == 0:
+                    separator = _JSON_SEPARATOR.match(buf, m.end())
+                    if separator.group(1):
+                        return m.end(), m.end(), depth
+                    if separator.end() == len(buf) and not eof:
+                        return None, m.start(), depth + 1 if closed else depth
+            elif kind == 'quote' and not eof:
+                return None, m.start(), depth
+        return None, len(buf), depth
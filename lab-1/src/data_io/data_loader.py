@@ -1,34 +1,527 @@
+import codecs
+import csv
+import itertools
 import json
+import random
+import re
 from pathlib import Path
-from typing import List, Dict, Any
-from models.records import Record
-from config.settings import settings
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from models.records import Record, RecordColumns, RecordSample, to_timestamp
+from config.settings import settings, AnalysisContext
+from core.sampling import ReservoirSampler, sample_size_for
+from data_io.fast_parser import fast_parser
+from data_io.planner import ExecutionPlan, IN_MEMORY, SPILL, memory_planner
+from data_io.spill import SpilledRecords
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+CSV_SUFFIXES = ('.csv',)
+TSV_SUFFIXES = ('.tsv', '.tab')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters that could extend a number cut off at the end of a read block.
+_NUMBER_CONTINUATION = frozenset('0123456789.eE+-')
+
+
+def detect_format(file_path: Path) -> str:
+    """Return the input format of a file based on its suffix."""
+    suffix = Path(file_path).suffix.lower()
+    if suffix in NDJSON_SUFFIXES:
+        return 'ndjson'
+    if suffix in CSV_SUFFIXES:
+        return 'csv'
+    if suffix in TSV_SUFFIXES:
+        return 'tsv'
+    return 'json'
+
+
+class _CountedLines:
+    """Decoded lines of a binary file, tracking how many bytes have been consumed."""
+
+    def __init__(self, f, encoding: str):
+        self._f = f
+        self._encoding = encoding
+        self.offset = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self._f:
+            self.offset += len(line)
+            yield line.decode(self._encoding)
 
 
 class DataLoader:
-    def __init__(self):
+    # Bytes read backwards per step when locating the start of a line.
+    SEEK_BLOCK_SIZE = 4096
+    # Bytes read from the head of a file to estimate its line count.
+    SEEK_PILOT_BYTES = 1 << 16
+
+    def __init__(self, context: AnalysisContext = None):
         self._cache = {}
+        self.context = context
 
-    def load_records(self, file_path: Path = None) -> List[Record]:
-        """Load records from JSON file."""
+    @property
+    def _config(self):
+        """The run's context, or the global settings when none was given."""
+        return self.context if self.context is not None else settings
+
+    def load_records(self, file_path: Path = None) -> Union[List[Record], RecordColumns, SpilledRecords]:
+        """Load records from a JSON array, NDJSON, CSV or TSV file.
+
+        When `max_memory` is configured the records are planned against it
+        and come back as in-memory columns or spilled to disk; spilled
+        records must be closed by the caller.
+        """
         if file_path is None:
-            file_path = settings.data_path
+            file_path = self._config.data_path
 
         try:
-            with open(file_path, 'r', encoding=settings.encoding) as f:
-                raw_data = json.load(f)
+            if self._config.max_memory is not None:
+                plan = self.plan(file_path, materialize=True)
+                if plan.strategy == IN_MEMORY:
+                    return self.load_columns(file_path, plan.block_size)
+                return self._spill(file_path, plan)
+            if self._is_delimited(file_path):
+                return [Record(status=status, value=value, timestamp=to_timestamp(timestamp))
+                        for status, value, timestamp in self._iter_delimited(file_path, memory_planner.BLOCK_SIZE)]
+            if self._use_fast_parser(file_path):
+                with open(file_path, 'rb') as f:
+                    records = fast_parser.parse_records(f)
+                if records is not None:
+                    return records
+            with open(file_path, 'r', encoding=self._config.encoding) as f:
+                if self._is_ndjson(file_path):
+                    raw_data = [json.loads(line) for line in f if line.strip()]
+                else:
+                    raw_data = json.load(f)
             return self._parse_records(raw_data)
-        except (FileNotFoundError, json.JSONDecodeError):
+        except (FileNotFoundError, json.JSONDecodeError, csv.Error):
             return self._get_fallback_data()
 
+    def plan(self, file_path: Path = None, materialize: bool = False) -> ExecutionPlan:
+        """Plan how to load `file_path` within the configured `max_memory`."""
+        if file_path is None:
+            file_path = self._config.data_path
+        return memory_planner.plan(Path(file_path), self._config.max_memory,
+                                   detect_format(file_path), materialize)
+
+    def iter_batches(self, file_path: Path = None, plan: ExecutionPlan = None) -> Iterator[List[Record]]:
+        """Yield records in batches, following `plan` (planned from the configuration if omitted).
+
+        A missing file yields the fallback data; decoding errors propagate
+        since earlier batches may already have been consumed.
+        """
+        if file_path is None:
+            file_path = self._config.data_path
+        try:
+            if plan is None:
+                plan = self.plan(file_path)
+        except FileNotFoundError:
+            yield self._get_fallback_data()
+            return
+
+        if plan.strategy == IN_MEMORY:
+            yield from self.load_columns(file_path, plan.block_size).batches(plan.batch_size)
+        elif plan.strategy == SPILL:
+            with self._spill(file_path, plan) as spilled:
+                yield from spilled.batches()
+        else:
+            batch = []
+            for status, value, timestamp in self._iter_fields(file_path, plan.block_size):
+                batch.append(Record(status=status, value=value, timestamp=to_timestamp(timestamp)))
+                if len(batch) == plan.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def load_columns(self, file_path: Path = None,
+                     block_size: int = memory_planner.BLOCK_SIZE) -> RecordColumns:
+        """Decode a file incrementally straight into columnar records.
+
+        JSON arrays of plain {"status", "value"} objects go through the
+        specialised fast parser; anything it does not recognise is decoded
+        by the generic json path.
+        """
+        if file_path is None:
+            file_path = self._config.data_path
+        if self._use_fast_parser(file_path):
+            with open(file_path, 'rb') as f:
+                columns = fast_parser.parse_columns(f, block_size)
+            if columns is not None:
+                return columns
+
+        columns = RecordColumns()
+        for status, value, _ in self._iter_fields(file_path, block_size):
+            columns.append(status, value)
+        return columns
+
+    def _use_fast_parser(self, file_path: Path) -> bool:
+        """Whether `file_path` may be tried with the specialised JSON-array parser."""
+        return self._config.fast_parser and detect_format(file_path) == 'json' and \
+            codecs.lookup(self._config.encoding).name == 'utf-8'
+
+    def _spill(self, file_path: Path, plan: ExecutionPlan) -> SpilledRecords:
+        """Decode a file into columnar batches written to a temporary file."""
+        spilled = SpilledRecords()
+        columns = RecordColumns()
+        for status, value, _ in self._iter_fields(file_path, plan.block_size):
+            columns.append(status, value)
+            if len(columns) == plan.batch_size:
+                spilled.write_batch(columns)
+                columns = RecordColumns()
+        if len(columns):
+            spilled.write_batch(columns)
+        return spilled
+
+    def _iter_fields(self, file_path: Path, block_size: int) -> Iterator[Tuple[Any, Any, Any]]:
+        """Yield raw (status, value, timestamp) fields one record at a time, in any input format."""
+        if self._is_delimited(file_path):
+            return self._iter_delimited(file_path, block_size)
+        return (self._fields(item) + (self._timestamp_field(item),)
+                for item in self._iter_raw(file_path, block_size))
+
+    def _iter_delimited(self, file_path: Path, block_size: int) -> Iterator[Tuple[Any, Any, Any]]:
+        """Yield (status, value, timestamp) fields from CSV/TSV rows without a dict per row.
+
+        The first non-blank row is a header if it names a status, value or
+        timestamp column, with `status` preferred over `STATUS`; otherwise
+        the columns are status then value. Missing cells get the same
+        defaults as missing JSON keys.
+        """
+        delimiter = '\t' if detect_format(file_path) == 'tsv' else ','
+        with open(file_path, 'r', encoding=self._config.encoding, newline='', buffering=block_size) as f:
+            rows = csv.reader(f, delimiter=delimiter)
+            header = next((row for row in rows if row), None)
+            if header is None:
+                return
+            indexes = self._header_indexes(header)
+            if indexes == (None, None, None):
+                indexes = (0, 1, None)
+                rows = itertools.chain([header], rows)
+
+            for row in rows:
+                if row:
+                    yield self._row_fields(row, indexes)
+
+    def _iter_delimited_located(self, file_path: Path,
+                                block_size: int) -> Iterator[Tuple[int, Tuple[Any, Any, Any]]]:
+        """Like `_iter_delimited`, also giving the byte offset where each row starts."""
+        delimiter = '\t' if detect_format(file_path) == 'tsv' else ','
+        with open(file_path, 'rb', buffering=block_size) as f:
+            lines = _CountedLines(f, self._config.encoding)
+            rows = csv.reader(lines, delimiter=delimiter)
+            start = 0
+            for header in rows:
+                if header:
+                    break
+                start = lines.offset
+            else:
+                return
+            indexes = self._header_indexes(header)
+            if indexes == (None, None, None):
+                indexes = (0, 1, None)
+                yield start, self._row_fields(header, indexes)
+
+            start = lines.offset
+            for row in rows:
+                if row:
+                    yield start, self._row_fields(row, indexes)
+                start = lines.offset
+
+    @staticmethod
+    def _row_fields(row: List[str], indexes: Tuple[Optional[int], ...]) -> Tuple[Any, Any, Any]:
+        status_index, value_index, timestamp_index = indexes
+        width = len(row)
+        status = row[status_index] if status_index is not None and status_index < width else 'unknown'
+        value = row[value_index] if value_index is not None and value_index < width else 0
+        timestamp = row[timestamp_index] if timestamp_index is not None and timestamp_index < width else None
+        return status, value, timestamp
+
+    @staticmethod
+    def _header_indexes(header: List[str]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """Return the (status, value, timestamp) column positions named in `header`, if any."""
+        names = [name.strip() for name in header]
+
+        def find(*keys: str) -> Optional[int]:
+            for key in keys:
+                if key in names:
+                    return names.index(key)
+            return None
+
+        return find('status', 'STATUS'), find('value'), find('timestamp', 'TIMESTAMP')
+
+    def _iter_raw(self, file_path: Path, block_size: int) -> Iterator[Dict[str, Any]]:
+        """Yield raw JSON objects one at a time without reading the whole file."""
+        with open(file_path, 'r', encoding=self._config.encoding) as f:
+            if self._is_ndjson(file_path):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from self._iter_json_array(f, block_size)
+
+    @staticmethod
+    def _iter_json_array(f, block_size: int) -> Iterator[Any]:
+        """Incrementally decode the items of a top-level JSON array."""
+        for _, _, item in DataLoader._iter_json_spans(f, block_size):
+            yield item
+
+    @staticmethod
+    def _iter_json_spans(f, block_size: int) -> Iterator[Tuple[int, int, Any]]:
+        """Like `_iter_json_array`, also giving each item's start and end position in the stream."""
+        decoder = json.JSONDecoder()
+        buf = ''
+        base = 0  # stream position of buf[0]
+        pos = 0
+        eof = False
+        state = 'open'
+
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                if eof:
+                    if state == 'end':
+                        return
+                    raise json.JSONDecodeError("Unexpected end of data", buf, pos)
+                chunk = f.read(block_size)
+                base += pos
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+
+            char = buf[pos]
+            if state == 'open':
+                if char != '[':
+                    raise json.JSONDecodeError("Expecting '['", buf, pos)
+                pos += 1
+                state = 'first'
+            elif state == 'first' and char == ']':
+                pos += 1
+                state = 'end'
+            elif state in ('first', 'item'):
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(buf, pos)
+                        # A number at the end of the buffer may continue in the next block.
+                        if eof or (end < len(buf) and buf[end] not in _NUMBER_CONTINUATION):
+                            break
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    chunk = f.read(block_size)
+                    base += pos
+                    buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                yield base + pos, base + end, item
+                pos = end
+                state = 'separator'
+            elif state == 'separator' and char in ',]':
+                pos += 1
+                state = 'item' if char == ',' else 'end'
+            else:
+                raise json.JSONDecodeError("Unexpected data", buf, pos)
+
+    def iter_located(self, file_path: Path = None,
+                     block_size: int = memory_planner.BLOCK_SIZE) -> Iterator[Tuple[Optional[int], Record]]:
+        """Yield (byte offset, record) pairs, the offset being where the raw record starts.
+
+        The offsets can be handed to `read_raw` later to fetch the source
+        text of a few records with direct seeks. JSON offsets assume an
+        ASCII-compatible encoding. A missing file yields the fallback data
+        with no offsets.
+        """
+        if file_path is None:
+            file_path = self._config.data_path
+        if not Path(file_path).exists():
+            for record in self._get_fallback_data():
+                yield None, record
+            return
+
+        file_format = detect_format(file_path)
+        if file_format in ('csv', 'tsv'):
+            for offset, (status, value, timestamp) in self._iter_delimited_located(file_path, block_size):
+                yield offset, Record(status=status, value=value, timestamp=to_timestamp(timestamp))
+        elif file_format == 'ndjson':
+            with open(file_path, 'rb', buffering=block_size) as f:
+                offset = 0
+                for line in f:
+                    text = line.decode(self._config.encoding)
+                    if text.strip():
+                        yield offset, self._record(json.loads(text))
+                    offset += len(line)
+        else:
+            # Latin-1 maps bytes one to one onto characters, so stream positions are byte offsets.
+            with open(file_path, 'r', encoding='latin-1', newline='') as f, open(file_path, 'rb') as raw:
+                for start, end, item in self._iter_json_spans(f, block_size):
+                    if isinstance(item, dict) and not all(
+                            v.isascii() for v in item.values() if isinstance(v, str)):
+                        raw.seek(start)
+                        item = json.loads(raw.read(end - start).decode(self._config.encoding))
+                    yield start, self._record(item)
+
+    def read_raw(self, offsets: List[int], file_path: Path = None) -> List[str]:
+        """Return the source text of the records starting at each of `offsets`."""
+        if file_path is None:
+            file_path = self._config.data_path
+        file_format = detect_format(file_path)
+        raws = []
+        with open(file_path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                if file_format == 'ndjson':
+                    raw = f.readline()
+                elif file_format in ('csv', 'tsv'):
+                    lines = _CountedLines(f, self._config.encoding)
+                    next(csv.reader(lines, delimiter='\t' if file_format == 'tsv' else ','), None)
+                    f.seek(offset)
+                    raw = f.read(lines.offset)
+                else:
+                    raw = self._read_json_value(f)
+                raws.append(raw.decode(self._config.encoding).rstrip('\r\n'))
+        return raws
+
+    def _read_json_value(self, f) -> bytes:
+        """Read the bytes of the JSON value starting at the current position of `f`."""
+        decoder = json.JSONDecoder()
+        data = b''
+        while True:
+            chunk = f.read(self.SEEK_BLOCK_SIZE)
+            data += chunk
+            try:
+                _, end = decoder.raw_decode(data.decode('latin-1'))
+                return data[:end]
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+
+    def parse_chunk(self, chunk: bytes, first: bool, last: bool,
+                    file_format: str = 'json') -> List[Record]:
+        """Parse one content-defined chunk of a file into records."""
+        if file_format == 'ndjson':
+            text = chunk.decode(self._config.encoding)
+            return self._parse_records([json.loads(line) for line in text.splitlines() if line.strip()])
+        return self._parse_records(json.loads('[' + self.check_chunk_edges(chunk, first, last) + ']'))
+
+    def check_chunk_edges(self, chunk: bytes, first: bool, last: bool) -> str:
+        """Return the records of a JSON array chunk without its delimiters.
+
+        Chunks are slices of the top-level array: the first starts with '[',
+        the others with the ',' before their first record, and the last ends
+        with ']'. Raises json.JSONDecodeError otherwise.
+        """
+        text = chunk.decode(self._config.encoding)
+        body = text.strip(' \t\n\r')
+        opening = '[' if first else ','
+        if not body.startswith(opening):
+            raise json.JSONDecodeError(f"Expecting '{opening}'", text, 0)
+        body = body[1:]
+        if last:
+            if not body.endswith(']'):
+                raise json.JSONDecodeError("Expecting ']'", text, len(text))
+            body = body[:-1]
+        return body
+
+    def sample_records(self, sample_size: int = None, fraction: float = None,
+                       file_path: Path = None, rng: random.Random = None) -> RecordSample:
+        """Draw a random sample of records, sized by count or by fraction of the file.
+
+        NDJSON files are sampled with random byte seeks, so only the sampled
+        lines are read; other formats are streamed through a reservoir. A
+        missing or malformed file is sampled from the fallback data.
+        """
+        if file_path is None:
+            file_path = self._config.data_path
+        if rng is None:
+            rng = random.Random()
+
+        sample = self._seek_sample if self._is_ndjson(file_path) else self._stream_sample
+        try:
+            return sample(Path(file_path), sample_size, fraction, rng)
+        except (FileNotFoundError, json.JSONDecodeError, csv.Error):
+            records = self._get_fallback_data()
+
+        if sample_size is None:
+            sample_size = sample_size_for(fraction, len(records))
+        sampler = ReservoirSampler(sample_size, rng)
+        sampler.extend(records)
+        return sampler.to_sample()
+
+    def _stream_sample(self, file_path: Path, sample_size: Optional[int],
+                       fraction: Optional[float], rng: random.Random) -> RecordSample:
+        """Reservoir-sample a JSON array, CSV or TSV file in one pass, holding only the draws.
+
+        A fraction is turned into a draw count from the planner's record
+        estimate; the weights use the exact number of records seen.
+        """
+        if sample_size is None:
+            sample_size = sample_size_for(fraction, memory_planner.estimate_records(
+                file_path, detect_format(file_path)))
+        sampler = ReservoirSampler(sample_size, rng)
+        sampler.extend(self._iter_fields(file_path, memory_planner.BLOCK_SIZE))
+        drawn = sampler.to_sample()
+        records = [Record(status=status, value=value, timestamp=to_timestamp(timestamp))
+                   for status, value, timestamp in drawn.records]
+        return RecordSample(records=records, weights=drawn.weights, population=drawn.population)
+
+    def _seek_sample(self, file_path: Path, sample_size: Optional[int],
+                     fraction: Optional[float], rng: random.Random) -> RecordSample:
+        """Sample lines with probability proportional to their byte length.
+
+        Each draw is weighted by file_size / line_length, which keeps the
+        estimates unbiased even when line lengths vary.
+        """
+        size = file_path.stat().st_size
+        records, weights = [], []
+        with open(file_path, 'rb') as f:
+            if size == 0:
+                return RecordSample(records=records, weights=weights)
+            if sample_size is None:
+                head = f.read(self.SEEK_PILOT_BYTES)
+                sample_size = sample_size_for(fraction, size * max(head.count(b'\n'), 1) / len(head))
+
+            for _ in range(sample_size):
+                line = self._line_at(f, rng.randrange(size))
+                weights.append(size / len(line))
+                text = line.decode(self._config.encoding).strip()
+                records.append(self._parse_records([json.loads(text)])[0] if text else None)
+        return RecordSample(records=records, weights=weights)
+
+    def _line_at(self, f, offset: int) -> bytes:
+        """Return the full line (including its newline) containing byte `offset`."""
+        start = offset
+        while start > 0:
+            block_start = max(0, start - self.SEEK_BLOCK_SIZE)
+            f.seek(block_start)
+            newline = f.read(start - block_start).rfind(b'\n')
+            if newline != -1:
+                start = block_start + newline + 1
+                break
+            start = block_start
+        f.seek(start)
+        return f.readline()
+
+    @staticmethod
+    def _is_ndjson(file_path: Path) -> bool:
+        return detect_format(file_path) == 'ndjson'
+
+    @staticmethod
+    def _is_delimited(file_path: Path) -> bool:
+        return detect_format(file_path) in ('csv', 'tsv')
+
+    @staticmethod
+    def _fields(item: Dict[str, Any]) -> Tuple[Any, Any]:
+        """Extract (status, value) from a raw JSON object, applying the defaults."""
+        return item.get('status', item.get('STATUS', 'unknown')), item.get('value', 0)
+
+    @staticmethod
+    def _timestamp_field(item: Dict[str, Any]) -> Any:
+        """The raw event timestamp of a JSON object, None when absent."""
+        return item.get('timestamp', item.get('TIMESTAMP'))
+
+    def _record(self, item: Dict[str, Any]) -> Record:
+        status, value = self._fields(item)
+        return Record(status=status, value=value, timestamp=to_timestamp(self._timestamp_field(item)))
+
     def _parse_records(self, raw_data: List[Dict[str, Any]]) -> List[Record]:
-        """Parse raw JSON data into Record objects."""
-        records = []
-        for item in raw_data:
-            status = item.get('status', item.get('STATUS', 'unknown'))
-            value = item.get('value', 0)
-            records.append(Record(status=status, value=value))
-        return records
+        """Parse raw JSON data into Record objects, with the event timestamp when present."""
+        return [self._record(item) for item in raw_data]
 
     def _get_fallback_data(self) -> List[Record]:
         """Provide fallback data when file loading fails."""
@@ -36,4 +529,4 @@ class DataLoader:
             Record(status="ok", value="3"),
             Record(status="bad", value="x"),
             Record(status="ok", value=7)
-        ]
\ No newline at end of file
+        ]
@@ -0,0 +1,178 @@
+import math
+import re
+from typing import BinaryIO, Callable, List, Optional, Pattern, Tuple
+from models.records import Record, RecordColumns
+
+_WS = rb'[ \t\n\r]*'
+# Status strings without escapes or control characters; value strings limited to
+# printable ASCII so float() sees exactly what the json module would decode.
+_STATUS = rb'"([^"\\\x00-\x1f]*)"'
+_VALUE = rb'(?:(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)|"([ !#-\[\]-~]*)"|null)'
+_STATUS_FIELD = _WS + rb'"status"' + _WS + rb':' + _WS + _STATUS + _WS
+_VALUE_FIELD = _WS + rb'"value"' + _WS + rb':' + _WS + _VALUE + _WS
+
+# Groups: status, number, string value (status first) then number, string value, status.
+_RECORD = re.compile(rb'\{(?:' + _STATUS_FIELD + rb',' + _VALUE_FIELD + rb'|'
+                     + _VALUE_FIELD + rb',' + _STATUS_FIELD + rb')\}')
+# A status-first record with every whitespace run captured, to derive its exact layout.
+_LAYOUT_WS = rb'(' + _WS + rb')'
+_LAYOUT = re.compile(rb'\{' + _LAYOUT_WS + rb'"status"' + _LAYOUT_WS + rb':' + _LAYOUT_WS + _STATUS
+                     + _LAYOUT_WS + rb',' + _LAYOUT_WS + rb'"value"' + _LAYOUT_WS + rb':'
+                     + _LAYOUT_WS + _VALUE + _LAYOUT_WS + rb'\}')
+_OPEN = re.compile(_WS + rb'\[' + _WS + rb'\Z')
+_SEPARATOR = re.compile(_WS + rb',' + _WS + rb'\Z')
+_CLOSE = re.compile(_WS + rb'\]' + _WS + rb'\Z')
+_EMPTY = re.compile(_WS + rb'\[' + _WS + rb'\]' + _WS + rb'\Z')
+
+
+def _layout_pattern(sample: bytes) -> Optional[Pattern]:
+    """Pattern matching records laid out exactly like the first one in `sample`.
+
+    Files are usually written by a single serializer, so every record shares
+    the first record's whitespace; literal whitespace splits much faster than
+    whitespace classes. Groups are status, number, string value.
+    """
+    m = _LAYOUT.search(sample)
+    if m is None:
+        return None
+    ws = [re.escape(m.group(i)) for i in (1, 2, 3, 5, 6, 7, 8, 11)]
+    return re.compile(rb'\{' + ws[0] + rb'"status"' + ws[1] + rb':' + ws[2] + _STATUS + ws[3]
+                      + rb',' + ws[4] + rb'"value"' + ws[5] + rb':' + ws[6] + _VALUE + ws[7] + rb'\}')
+
+
+def _string_value(raw: Optional[bytes]) -> float:
+    if raw is None:  # null
+        return math.nan
+    try:
+        value = float(raw)
+    except ValueError:
+        return math.nan
+    return math.nan if value != value else value
+
+
+class FastRecordParser:
+    """Parser specialised for arrays of {"status": ..., "value": ...} objects.
+
+    Each block of raw bytes is split on the record pattern in one regex pass
+    and the captured fields are converted straight into columns, skipping the
+    per-record dict that json builds. Anything else (extra keys, escapes,
+    nesting, non-UTF-8 input) makes `parse_columns` and `parse_records`
+    return None so the caller can use the generic json path instead.
+    """
+    BLOCK_SIZE = 1 << 20
+    # Longest run of bytes without a closing brace accepted before giving up.
+    MAX_RECORD_BYTES = 1 << 12
+
+    def parse_columns(self, f: BinaryIO, block_size: int = BLOCK_SIZE) -> Optional[RecordColumns]:
+        columns = RecordColumns()
+        status_cache = {}
+        if not self._parse(f, block_size, lambda groups: self._append(columns, groups, status_cache)):
+            return None
+        return columns
+
+    def parse_records(self, f: BinaryIO, block_size: int = BLOCK_SIZE) -> Optional[List[Record]]:
+        """Like `parse_columns`, but as Records holding the values exactly as json decodes them."""
+        records = []
+        status_cache = {}
+        if not self._parse(f, block_size, lambda groups: self._append_records(records, groups, status_cache)):
+            return None
+        return records
+
+    def _parse(self, f: BinaryIO, block_size: int, append: Callable[[List], None]) -> bool:
+        """Feed the record groups of each block to `append`; False if the file does not fit."""
+        layout = None
+        buf = b''
+        first = True
+
+        while True:
+            chunk = f.read(block_size)
+            buf += chunk
+            if chunk and b'}' not in buf:
+                if len(buf) > block_size + self.MAX_RECORD_BYTES:
+                    return False
+                continue
+
+            if layout is None:
+                layout = _layout_pattern(buf) or _RECORD
+            groups = self._split(layout, buf, first)
+            if not groups and layout is not _RECORD:
+                # The file strays from the first record's layout; use the general pattern.
+                layout = _RECORD
+                groups = self._split(layout, buf, first)
+            if groups is None:
+                return False
+            if not groups and len(buf) > block_size + self.MAX_RECORD_BYTES:
+                return False
+            if groups:
+                try:
+                    append(groups)
+                except UnicodeDecodeError:
+                    return False
+                first = False
+                buf = groups[-1]
+
+            if not chunk:
+                break
+
+        if first:
+            return _EMPTY.match(buf) is not None
+        return _CLOSE.match(buf) is not None
+
+    @staticmethod
+    def _split(pattern: Pattern, buf: bytes, first: bool) -> Optional[List]:
+        """Split `buf` into one list per capture group plus the unconsumed rest.
+
+        Returns None if anything but separators lies between records, and an
+        empty list if `buf` holds no record. The rest is the text after the
+        last record, carried over to the next block.
+        """
+        parts = pattern.split(buf)
+        if len(parts) == 1:
+            return []
+        step = pattern.groups + 1
+        gaps = parts[::step]
+        leading = _OPEN if first else _SEPARATOR
+        if leading.match(gaps[0]) is None:
+            return None
+        for gap in set(gaps[1:-1]):
+            if _SEPARATOR.match(gap) is None:
+                return None
+        # Strided slices pick each group out without building a tuple per record.
+        end = len(parts) - 1
+        return [parts[i:end:step] for i in range(1, step)] + [parts[-1]]
+
+    @staticmethod
+    def _fields(groups: List) -> Tuple[List, List, List]:
+        """Raw statuses, numbers and string values, whichever key came first."""
+        if len(groups) == 4:
+            raw_statuses, numbers, strings, _ = groups
+            return raw_statuses, numbers, strings
+        statuses_a, numbers_a, strings_a, numbers_b, strings_b, statuses_b, _ = groups
+        return ([a if a is not None else b for a, b in zip(statuses_a, statuses_b)],
+                [a if a is not None else b for a, b in zip(numbers_a, numbers_b)],
+                [a if a is not None else b for a, b in zip(strings_a, strings_b)])
+
+    @staticmethod
+    def _statuses(raw_statuses: List[bytes], status_cache: dict) -> List[str]:
+        for raw_status in set(raw_statuses).difference(status_cache):
+            status_cache[raw_status] = raw_status.decode('utf-8')
+        return [status_cache[s] for s in raw_statuses]
+
+    def _append(self, columns: RecordColumns, groups: List, status_cache: dict) -> None:
+        raw_statuses, numbers, strings = self._fields(groups)
+        columns.statuses.extend(self._statuses(raw_statuses, status_cache))
+        columns.values.extend([float(n) if n is not None else _string_value(q)
+                               for n, q in zip(numbers, strings)])
+
+    def _append_records(self, records: List[Record], groups: List, status_cache: dict) -> None:
+        raw_statuses, numbers, strings = self._fields(groups)
+        # Numbers become int or float like json decodes them; string values are
+        # printable ASCII without escapes, so they decode as-is
+        values = [(float(n) if b'.' in n or b'e' in n or b'E' in n else int(n)) if n is not None
+                  else q.decode('ascii') if q is not None else None
+                  for n, q in zip(numbers, strings)]
+        records.extend(map(Record, self._statuses(raw_statuses, status_cache), values))
+
+
+# Singleton instance
+fast_parser = FastRecordParser()
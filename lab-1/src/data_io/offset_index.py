@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+from models.records import AnalysisResult
+
+
+class TopIndex:
+    """JSON file remembering each analysis's result and top-k record offsets.
+
+    Entries are keyed by the resolved input path and the settings
+    fingerprint, and stay valid while the input's size and modification
+    time are unchanged, so a repeat query only seeks to the stored offsets.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def lookup(self, file_path: Path, fingerprint: str,
+               k: int) -> Optional[Tuple[AnalysisResult, List[Tuple[float, int]]]]:
+        """Return the stored result and first k (value, offset) entries, if still valid."""
+        entry = self._load().get(self._key(file_path, fingerprint))
+        if entry is None or entry['k'] < k or entry['stamp'] != self._stamp(file_path):
+            return None
+        count, total = entry['count'], entry['total']
+        result = AnalysisResult(count=count, total=total, average=total / count if count else 0.0)
+        return result, [(value, offset) for value, offset in entry['entries'][:k]]
+
+    def store(self, file_path: Path, fingerprint: str, k: int, result: AnalysisResult,
+              entries: List[Tuple[float, int]]) -> None:
+        index = self._load()
+        index[self._key(file_path, fingerprint)] = {
+            'stamp': self._stamp(file_path), 'k': k, 'count': result.count, 'total': result.total,
+            'entries': [[value, offset] for value, offset in entries]
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        tmp_path.replace(self.path)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _key(file_path: Path, fingerprint: str) -> str:
+        return f"{Path(file_path).resolve()}|{fingerprint}"
+
+    @staticmethod
+    def _stamp(file_path: Path) -> List[int]:
+        stat = Path(file_path).stat()
+        return [stat.st_size, stat.st_mtime_ns]
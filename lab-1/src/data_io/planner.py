@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+IN_MEMORY = 'in-memory'
+STREAMING = 'streaming'
+SPILL = 'spill'
+
+
+@dataclass
+class ExecutionPlan:
+    strategy: str
+    estimated_records: int
+    working_set: int
+    budget: Optional[int]
+    batch_size: int
+    block_size: int
+
+    def format_summary(self) -> str:
+        return (f"plan={self.strategy} records~{self.estimated_records} "
+                f"working_set~{_mib(self.working_set)} "
+                f"budget={_mib(self.budget) if self.budget is not None else 'none'} "
+                f"batch={self.batch_size}")
+
+
+def _mib(size: int) -> str:
+    return f"{size / (1 << 20):.1f}MiB"
+
+
+class MemoryPlanner:
+    """Pick the cheapest loading strategy whose estimated working set fits a budget.
+
+    Estimates are per record: each record of a batch costs about RECORD_BYTES,
+    covering the batch being decoded and the previous one still held by the
+    caller, and a columnar entry costs COLUMN_BYTES. The incremental decoder
+    holds up to BUFFER_BLOCKS read blocks at once: the unconsumed text, the
+    new block, their concatenation and the reader's own buffers. Plans are
+    fitted into the budget less RESERVE_PERCENT, for allocator and
+    interpreter overhead the estimates do not cover.
+    """
+    RECORD_BYTES = 400
+    COLUMN_BYTES = 24
+    BLOCK_SIZE = 1 << 20
+    MIN_BLOCK_SIZE = 1 << 14
+    BUFFER_BLOCKS = 5
+    RESERVE_PERCENT = 10
+    DEFAULT_BATCH_SIZE = 10000
+    MIN_BATCH_SIZE = 100
+    PILOT_BYTES = 1 << 16
+
+    def minimum_budget(self) -> int:
+        """The smallest budget `plan` accepts."""
+        working_set = self.MIN_BLOCK_SIZE * self.BUFFER_BLOCKS + self.MIN_BATCH_SIZE * self.RECORD_BYTES
+        return -(-working_set * 100 // (100 - self.RESERVE_PERCENT))
+
+    def plan(self, file_path: Path, budget: Optional[int], file_format: str = 'json',
+             materialize: bool = False) -> ExecutionPlan:
+        """Plan a run over `file_path` within `budget` bytes.
+
+        In-memory columnar storage is preferred when it fits. Otherwise
+        callers that only aggregate stream fixed-size batches, while callers
+        that need every record kept (`materialize`) spill columns to disk.
+        Without a budget the default streaming batches are used.
+        """
+        records = self.estimate_records(Path(file_path), file_format)
+        if budget is None:
+            working_set = self.BLOCK_SIZE * self.BUFFER_BLOCKS + self.DEFAULT_BATCH_SIZE * self.RECORD_BYTES
+            return ExecutionPlan(STREAMING, records, working_set, None,
+                                 self.DEFAULT_BATCH_SIZE, self.BLOCK_SIZE)
+
+        usable = budget * (100 - self.RESERVE_PERCENT) // 100
+        block_size = self.BLOCK_SIZE
+        while block_size > self.MIN_BLOCK_SIZE and \
+                block_size * self.BUFFER_BLOCKS + self.MIN_BATCH_SIZE * self.RECORD_BYTES > usable:
+            block_size //= 2
+        buffer = block_size * self.BUFFER_BLOCKS
+        batch_size = min(self.DEFAULT_BATCH_SIZE, (usable - buffer) // self.RECORD_BYTES)
+        if batch_size < self.MIN_BATCH_SIZE:
+            raise ValueError(f"Memory budget of {budget} bytes is below the minimum working set")
+        batch_set = buffer + min(batch_size, max(records, 1)) * self.RECORD_BYTES
+
+        in_memory_set = batch_set + records * self.COLUMN_BYTES
+        if in_memory_set <= usable:
+            return ExecutionPlan(IN_MEMORY, records, in_memory_set, budget, batch_size, block_size)
+        strategy = SPILL if materialize else STREAMING
+        return ExecutionPlan(strategy, records, batch_set, budget, batch_size, block_size)
+
+    def estimate_records(self, file_path: Path, file_format: str = 'json') -> int:
+        """Extrapolate the record count from the records found in the file's head."""
+        size = file_path.stat().st_size
+        with open(file_path, 'rb') as f:
+            head = f.read(self.PILOT_BYTES)
+        if not head:
+            return 0
+        if file_format == 'json':
+            found = head.count(b'{') or 1
+        else:
+            # Line-oriented formats: one record per line.
+            found = head.count(b'\n') or 1
+        return int(size * found / len(head))
+
+
+# Singleton instance
+memory_planner = MemoryPlanner()
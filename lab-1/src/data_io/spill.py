@@ -0,0 +1,51 @@
+import pickle
+import tempfile
+from typing import Iterator, List
+from models.records import Record, RecordColumns
+
+
+class SpilledRecords:
+    """Records kept on disk as pickled columnar batches instead of in memory.
+
+    Behaves like a read-only record sequence: it has a length and can be
+    iterated any number of times, holding one batch in memory at a time.
+    The temporary file is removed on `close`, or when used as a context
+    manager, on exit.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._count = 0
+
+    def write_batch(self, columns: RecordColumns) -> None:
+        self._file.seek(0, 2)
+        pickle.dump((columns.statuses, columns.values), self._file, pickle.HIGHEST_PROTOCOL)
+        self._count += len(columns)
+
+    def batches(self) -> Iterator[List[Record]]:
+        self._file.seek(0)
+        while True:
+            try:
+                statuses, values = pickle.load(self._file)
+            except EOFError:
+                return
+            columns = RecordColumns(statuses, values)
+            position = self._file.tell()
+            yield list(columns)
+            self._file.seek(position)
+
+    def __iter__(self) -> Iterator[Record]:
+        for batch in self.batches():
+            yield from batch
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,22 +1,61 @@
+import datetime as dt
+import math
+from array import array
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+
+def to_numeric(value: Any) -> Optional[float]:
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        elif isinstance(value, str):
+            return float(value)
+    except (ValueError, TypeError):
+        return None
+    return None
+
+
+def to_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from a number or an ISO-8601 string (UTC unless it has an offset)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    try:
+        number = float(text)
+        return number if math.isfinite(number) else None
+    except ValueError:
+        pass
+    if text[-1:] in ('Z', 'z'):
+        text = text[:-1] + '+00:00'
+    try:
+        parsed = dt.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Render epoch seconds in UTC like the CLI's run stamps."""
+    return dt.datetime.fromtimestamp(timestamp, dt.timezone.utc).strftime("%Y/%m/%d-%H:%M:%S")
+
 
 @dataclass
 class Record:
     status: str
     value: Union[int, float, str]
+    timestamp: Optional[float] = None  # event time, epoch seconds
     def normalize_status(self)-> str:
         return self.status.lower()
 
     def get_numeric_value(self)-> Optional[float]:
-        try:
-            if isinstance(self.value, (int, float)):
-                return float(self.value)
-            elif isinstance(self.value, str):
-                return float(self.value)
-        except (ValueError, TypeError):
-            return None
-        return None
+        return to_numeric(self.value)
 
     def is_valid(self, threshold: float = 0) -> bool:
         numeric_value = self.get_numeric_value()
@@ -32,4 +71,90 @@ class AnalysisResult:
     average: float
 
     def format_summary(self, timestamp: str) -> str:
-        return f"[{timestamp}] ok_count={self.count} total_value={self.total:.2f} avg={self.average:.2f}"
\ No newline at end of file
+        return f"[{timestamp}] ok_count={self.count} total_value={self.total:.2f} avg={self.average:.2f}"
+
+    def merge(self, other: 'AnalysisResult') -> 'AnalysisResult':
+        """Combine results of two disjoint sets of records."""
+        count = self.count + other.count
+        total = self.total + other.total
+        return AnalysisResult(count=count, total=total, average=total / count if count else 0.0)
+
+
+@dataclass
+class WindowedAnalysisResult(AnalysisResult):
+    """Statistics of the records whose event time falls in [start, end)."""
+    start: float = 0.0
+    end: float = 0.0
+
+    def format_summary(self, timestamp: str = None) -> str:
+        """Stamped with the window start unless another stamp is given."""
+        if timestamp is None:
+            timestamp = format_timestamp(self.start)
+        return (f"[{timestamp}] ok_count={self.count} total_value={self.total:.2f} avg={self.average:.2f} "
+                f"window_end={format_timestamp(self.end)}")
+
+
+@dataclass
+class SampledAnalysisResult(AnalysisResult):
+    """Statistics estimated from a sample; margins are confidence-interval half-widths."""
+    count_margin: float = 0.0
+    total_margin: float = 0.0
+    average_margin: float = 0.0
+    sample_size: int = 0
+    population: float = 0.0
+    confidence: float = 0.95
+
+    def format_summary(self, timestamp: str) -> str:
+        return (f"[{timestamp}] ok_count={self.count:.0f}\u00b1{self.count_margin:.0f} "
+                f"total_value={self.total:.2f}\u00b1{self.total_margin:.2f} "
+                f"avg={self.average:.2f}\u00b1{self.average_margin:.2f} "
+                f"sample={self.sample_size}/{self.population:.0f} ci={self.confidence:.0%}")
+
+
+@dataclass
+class RecordSample:
+    """Sampled records with the expansion weight (1 / selection probability) of each draw.
+
+    `records` may contain None for draws that hit something other than a record
+    (e.g. a blank line). `population` is set when the sample is uniform without
+    replacement over a stream of known size.
+    """
+    records: List[Optional[Record]]
+    weights: List[float]
+    population: Optional[int] = None
+
+
+class RecordColumns:
+    """Compact columnar records: a status list and a float array.
+
+    Values are stored already converted to numbers; non-numeric values are
+    stored as NaN and read back as None. Repeated statuses share one string.
+    """
+
+    def __init__(self, statuses: List[str] = None, values: array = None):
+        self.statuses: List[str] = statuses if statuses is not None else []
+        self.values = values if values is not None else array('d')
+        self._interned: Dict[str, str] = {}
+
+    def append(self, status: str, value: Any) -> None:
+        self.statuses.append(self._interned.setdefault(status, status))
+        numeric = to_numeric(value)
+        self.values.append(math.nan if numeric is None else numeric)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Record:
+        value = self.values[index]
+        return Record(status=self.statuses[index], value=None if value != value else value)
+
+    def __iter__(self) -> Iterator[Record]:
+        for status, value in zip(self.statuses, self.values):
+            yield Record(status=status, value=None if value != value else value)
+
+    def batches(self, size: int) -> Iterator[List[Record]]:
+        """Yield the records as lists of at most `size` records."""
+        for start in range(0, len(self), size):
+            yield [Record(status=status, value=None if value != value else value)
+                   for status, value in zip(self.statuses[start:start + size],
+                                            self.values[start:start + size])]
@@ -1,5 +1,9 @@
+import random
 import unittest
-from core.calculator import StatisticsCalculator
+from config.settings import Settings
+from core.calculator import StatisticsCalculator, WindowedAggregator, aggregate_with_windows
+from core.filters import record_filter
+from core.sketches import RecordSketches
 from models.records import Record
 
 
@@ -84,5 +88,97 @@ class TestStatisticsCalculator(unittest.TestCase):
         self.assertAlmostEqual(result.average, 2.333333333333333)
 
 
+
+class TestWindowedAggregator(unittest.TestCase):
+
+    def brute_force(self, records, size, slide):
+        """Windows ending at every multiple of `slide`, computed by scanning all records."""
+        times = [record.timestamp for record in records]
+        first = (min(times) // slide) * slide
+        last = (max(times) // slide + 1) * slide + size
+        windows = []
+        end = first + slide
+        while end <= last:
+            values = [r.value for r in records if end - size <= r.timestamp < end]
+            if values:
+                windows.append((end - size, end, len(values), float(sum(values))))
+            end += slide
+        return windows
+
+    def collect(self, records, size, slide=None, lateness=0.0):
+        return [(w.start, w.end, w.count, w.total)
+                for w in StatisticsCalculator.calculate_windows(records, size, slide, lateness)]
+
+    def test_tumbling_and_sliding_match_brute_force(self):
+        """Test in-order records give exactly the brute-force windows."""
+        rng = random.Random(11)
+        records = sorted((Record(status="ok", value=rng.randint(0, 9), timestamp=rng.uniform(0, 1000))
+                          for _ in range(500)), key=lambda record: record.timestamp)
+
+        for size, slide in ((60, 60), (60, 15), (100, 25), (30, 30)):
+            self.assertEqual(self.collect(records, size, slide), self.brute_force(records, size, slide))
+
+    def test_lateness_accepts_bounded_disorder(self):
+        """Test out-of-order records within the allowance land in the right windows."""
+        rng = random.Random(12)
+        records = [Record(status="ok", value=rng.randint(0, 9), timestamp=t + rng.uniform(0, 20))
+                   for t in range(0, 1000, 2)]
+        rng.shuffle(records[100:110])
+
+        self.assertEqual(self.collect(records, 60, 30, lateness=20),
+                         self.brute_force(records, 60, 30))
+
+    def test_records_beyond_lateness_are_dropped(self):
+        """Test records older than the allowance are counted as late and skipped."""
+        aggregator = WindowedAggregator(10, allowed_lateness=5)
+        windows = []
+        for timestamp, value in ((0, 1), (12, 2), (9, 4), (18, 3), (4, 100), (25, 5)):
+            windows += aggregator.add(Record(status="ok", value=value, timestamp=timestamp))
+        windows += aggregator.flush()
+
+        self.assertEqual(aggregator.late, 1)
+        self.assertEqual([(w.start, w.count, w.total) for w in windows],
+                         [(0.0, 2, 5.0), (10.0, 2, 5.0), (20.0, 1, 5.0)])
+
+    def test_windows_emitted_as_they_close(self):
+        """Test a window is returned by the first record past its end."""
+        aggregator = WindowedAggregator(60)
+
+        self.assertEqual(aggregator.add(Record(status="ok", value=1, timestamp=10)), [])
+        self.assertEqual(aggregator.add(Record(status="ok", value=2, timestamp=59)), [])
+        closed = aggregator.add(Record(status="ok", value=3, timestamp=3600))
+        self.assertEqual([(w.start, w.end, w.count, w.total) for w in closed], [(0.0, 60.0, 2, 3.0)])
+        self.assertEqual(len(aggregator.flush()), 1)
+
+    def test_untimed_and_non_numeric_records_are_skipped(self):
+        """Test records without a timestamp or numeric value are skipped."""
+        aggregator = WindowedAggregator(60)
+        aggregator.add(Record(status="ok", value=1))
+        aggregator.add(Record(status="ok", value="x", timestamp=1))
+
+        self.assertEqual(aggregator.skipped, 2)
+        self.assertEqual(aggregator.flush(), [])
+
+    def test_aggregate_with_windows_filters_once(self):
+        """Test the one-pass loop matches the eager result and windows only see qualifying records."""
+        records = [Record(status=["ok", "bad"][i % 2], value=i % 10, timestamp=float(i)) for i in range(300)]
+        context = Settings().snapshot(default_threshold=3)
+        windows = []
+        sketches = RecordSketches()
+        result = aggregate_with_windows(enumerate(records), WindowedAggregator(100), windows.append,
+                                        context, sketches, batch_size=32)
+
+        qualifying = record_filter.filter_records(records, context=context)
+        self.assertEqual(result, StatisticsCalculator.calculate_statistics(qualifying))
+        self.assertEqual(sum(w.count for w in windows), len(qualifying))
+        self.assertEqual(sketches.distinct_statuses.count(), 2)
+
+    def test_invalid_configuration(self):
+        """Test the size must be a positive multiple of the slide."""
+        for args in ((0,), (60, 25), (60, 30, -1)):
+            with self.assertRaises(ValueError):
+                WindowedAggregator(*args)
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import random
+import unittest
+from io import BytesIO
+from data_io.chunking import ContentChunker
+
+
+def _document(rng: random.Random, count: int) -> bytes:
+    records = [{"status": rng.choice(["ok", "bad", "OK"]), "value": rng.randint(0, 100)}
+               for _ in range(count)]
+    return json.dumps(records, indent=2).encode('utf-8')
+
+
+class TestContentChunker(unittest.TestCase):
+
+    def setUp(self):
+        self.chunker = ContentChunker(avg_size=1024)
+
+    def chunks(self, data: bytes, file_format: str = 'json'):
+        return list(self.chunker.iter_chunks(BytesIO(data), file_format))
+
+    def test_chunks_reassemble_file(self):
+        """Test chunks concatenate back to the original bytes."""
+        data = _document(random.Random(1), 2000)
+        chunks = self.chunks(data)
+
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b''.join(chunks), data)
+
+    def test_boundaries_follow_records(self):
+        """Test every cut falls right after a record's closing brace."""
+        for chunk in self.chunks(_document(random.Random(2), 2000))[:-1]:
+            self.assertTrue(chunk.endswith(b'}'))
+            self.assertLessEqual(len(chunk), self.chunker.max_size + 64)
+
+    def test_boundaries_independent_of_block_size(self):
+        """Test chunking does not depend on how the file is read."""
+        data = _document(random.Random(3), 2000)
+        expected = self.chunks(data)
+        self.chunker.BLOCK_SIZE = 7
+
+        self.assertEqual(self.chunks(data), expected)
+
+    def test_local_edit_keeps_other_chunks(self):
+        """Test an in-place edit only changes the chunks around it."""
+        rng = random.Random(4)
+        records = [{"status": "ok", "value": rng.randint(0, 100)} for _ in range(5000)]
+        before = self.chunks(json.dumps(records, indent=2).encode('utf-8'))
+        records[2500]["value"] = 12345
+        after = self.chunks(json.dumps(records, indent=2).encode('utf-8'))
+
+        changed = set(after) - set(before)
+        self.assertGreater(len(before), 20)
+        self.assertLessEqual(len(changed), 2)
+
+    def test_cuts_only_after_top_level_records(self):
+        """Test nested objects and braces inside strings never end a chunk."""
+        rng = random.Random(5)
+        records = [{"meta": {"k": rng.randint(0, 9), "tags": [{"x": 1}, {"y": "},{"}]},
+                    "note": "a \\\"}, {\" b", "status": "ok", "value": rng.randint(0, 100)}
+                   for _ in range(2000)]
+        data = json.dumps(records).encode('utf-8')
+        chunks = self.chunks(data)
+
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b''.join(chunks), data)
+        self.assertIsInstance(json.loads(chunks[0] + b']'), list)
+        for chunk in chunks[1:-1]:
+            self.assertTrue(chunk.startswith(b','))
+            self.assertIsInstance(json.loads(b'[' + chunk[1:] + b']'), list)
+
+        self.chunker.BLOCK_SIZE = 7
+        self.assertEqual(self.chunks(data), chunks)
+
+    def test_ndjson_cuts_after_newlines(self):
+        """Test NDJSON chunks hold whole lines."""
+        data = b''.join(json.dumps({"status": "ok", "value": i}).encode('utf-8') + b'\n'
+                        for i in range(2000))
+        chunks = self.chunks(data, 'ndjson')
+
+        self.assertEqual(b''.join(chunks), data)
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith(b'\n'))
+
+    def test_invalid_average_size(self):
+        """Test the average size must be a power of two."""
+        with self.assertRaises(ValueError):
+            ContentChunker(avg_size=1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
 from io import StringIO
 from cli.main import parse_arguments, main
+from config.settings import Settings
+from models.records import Record
 
 
 class TestCLI(unittest.TestCase):
@@ -38,6 +43,230 @@ class TestCLI(unittest.TestCase):
             self.assertIsNone(args.thres)
             self.assertFalse(args.all)
 
+    def test_parse_arguments_with_sketch_options(self):
+        """Test argument parsing with distinct-count and heavy-hitter options."""
+        test_args = ['--distinct', '--heavy-hitters', '3']
+
+        with patch.object(sys, 'argv', ['main.py'] + test_args):
+            args = parse_arguments()
+
+            self.assertTrue(args.distinct)
+            self.assertEqual(args.heavy_hitters, 3)
+
+    def test_parse_arguments_rejects_sampling_with_sketches(self):
+        """Test sampling options cannot be combined with sketch options."""
+        test_args = ['--sample', '10', '--distinct']
+
+        with patch.object(sys, 'argv', ['main.py'] + test_args):
+            with patch('sys.stderr', new_callable=StringIO):
+                with self.assertRaises(SystemExit):
+                    parse_arguments()
+
+    def test_parse_arguments_validates_sampling(self):
+        """Test --sample must be at least 1 and --sample-fraction in (0, 1]."""
+        for test_args in (['--sample', '0'], ['--sample-fraction', '0'], ['--sample-fraction', '2']):
+            with patch.object(sys, 'argv', ['main.py'] + test_args):
+                with patch('sys.stderr', new_callable=StringIO):
+                    with self.assertRaises(SystemExit):
+                        parse_arguments()
+
+        with patch.object(sys, 'argv', ['main.py', '--sample-fraction', '1']):
+            self.assertEqual(parse_arguments().sample_fraction, 1.0)
+
+    def test_parse_arguments_rejects_budget_below_minimum(self):
+        """Test --max-memory below the planner's minimum is a usage error."""
+        with patch.object(sys, 'argv', ['main.py', '--max-memory', '1K']):
+            with patch('sys.stderr', new_callable=StringIO) as stderr:
+                with self.assertRaises(SystemExit):
+                    parse_arguments()
+        self.assertIn("--max-memory must be at least", stderr.getvalue())
+
+    def test_parse_arguments_rejects_invalid_heavy_hitters(self):
+        """Test --heavy-hitters must be at least 1."""
+        for value in ['0', '-1']:
+            with patch.object(sys, 'argv', ['main.py', '--heavy-hitters', value]):
+                with patch('sys.stderr', new_callable=StringIO):
+                    with self.assertRaises(SystemExit):
+                        parse_arguments()
+
+    @patch('cli.main.DataLoader')
+    @patch('cli.main.estimate_statistics')
+    @patch('cli.main.calculator')
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_main_function_with_sample(self, mock_dt, mock_settings, mock_calculator, mock_estimate, mock_loader_class):
+        """Test main function estimates from a sample instead of loading everything."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_loader = MagicMock()
+        mock_loader_class.return_value = mock_loader
+        mock_estimate.return_value.format_summary.return_value = "sampled"
+
+        with patch.object(sys, 'argv', ['main.py', '--sample-fraction', '0.01']):
+            with patch('builtins.print') as mock_print:
+                main()
+
+                mock_loader.sample_records.assert_called_once_with(None, 0.01)
+                mock_loader.load_records.assert_not_called()
+                mock_calculator.calculate_statistics.assert_not_called()
+                mock_print.assert_called_once_with("sampled")
+
+    @patch('cli.main.DataLoader')
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_main_function_with_max_memory(self, mock_dt, mock_settings, mock_loader_class):
+        """Test main function aggregates planned batches and reports the plan."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_settings.snapshot.side_effect = Settings().snapshot
+        mock_loader = MagicMock()
+        mock_loader_class.return_value = mock_loader
+        mock_loader.plan.return_value.format_summary.return_value = "plan=streaming"
+        mock_loader.iter_batches.return_value = iter([
+            [Record(status="ok", value=10), Record(status="bad", value=99)],
+            [Record(status="ok", value=20)]
+        ])
+
+        with patch.object(sys, 'argv', ['main.py', '--max-memory', '64M']):
+            with patch('builtins.print') as mock_print:
+                result = main()
+
+                mock_settings.snapshot.assert_called_once_with(max_memory=64 << 20)
+                mock_loader.load_records.assert_not_called()
+                self.assertEqual((result.count, result.total, result.average), (2, 30.0, 15.0))
+                self.assertEqual(mock_print.call_args_list[-1][0][0], "plan=streaming")
+
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_main_function_with_delta_cache(self, mock_dt, mock_settings):
+        """Test main function reuses cached chunk results on a second run."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_settings.snapshot.side_effect = Settings().snapshot
+        records = [{"status": "ok", "value": i} for i in range(2000)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "data.json"
+            data_path.write_text(json.dumps(records, indent=2), encoding='utf-8')
+            argv = ['main.py', '--file', str(data_path), '--delta-cache', str(Path(tmp) / "cache.db")]
+
+            with patch.object(sys, 'argv', argv):
+                with patch('builtins.print') as mock_print:
+                    first = main()
+                    second = main()
+
+            self.assertEqual((first.count, first.total), (2000, float(sum(range(2000)))))
+            self.assertEqual((second.count, second.total), (first.count, first.total))
+            self.assertIn(" parsed=0", mock_print.call_args_list[-1][0][0])
+
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_main_function_with_top(self, mock_dt, mock_settings):
+        """Test --top prints the largest records' raw text and reuses its index."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_settings.snapshot.side_effect = Settings().snapshot
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "data.ndjson"
+            data_path.write_text(''.join(json.dumps({"status": "ok", "value": v}) + "\n" for v in (3, 9, 1, 7)),
+                                 encoding='utf-8')
+            argv = ['main.py', '--file', str(data_path), '--top', '2', '--top-index', str(Path(tmp) / "top.json")]
+
+            with patch.object(sys, 'argv', argv):
+                with patch('builtins.print') as mock_print:
+                    first = main()
+                    lines = [call[0][0] for call in mock_print.call_args_list]
+                with patch('cli.main.aggregate_with_top') as mock_aggregate:
+                    with patch('builtins.print'):
+                        second = main()
+                    mock_aggregate.assert_not_called()
+
+        self.assertEqual((first.count, first.total), (4, 20.0))
+        self.assertEqual(second, first)
+        self.assertEqual(lines[1:], ['top[1] value=9.00 offset=29 {"status": "ok", "value": 9}',
+                                     'top[2] value=7.00 offset=87 {"status": "ok", "value": 7}'])
+
+    def test_parse_arguments_rejects_top_with_sampling(self):
+        """Test --top cannot be combined with sampling and --top-index needs --top."""
+        for test_args in (['--top', '3', '--sample', '10'], ['--top-index', 'top.json'], ['--top', '0']):
+            with patch.object(sys, 'argv', ['main.py'] + test_args):
+                with patch('sys.stderr', new_callable=StringIO):
+                    with self.assertRaises(SystemExit):
+                        parse_arguments()
+
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_main_function_with_stream_windows(self, mock_dt, mock_settings):
+        """Test --window --stream prints windows before the overall summary."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_settings.snapshot.side_effect = Settings().snapshot
+        records = [{"status": "ok", "value": v, "timestamp": t} for v, t in ((1, 0), (2, 30), (4, 70), (8, 200))]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "data.json"
+            data_path.write_text(json.dumps(records), encoding='utf-8')
+            argv = ['main.py', '--file', str(data_path), '--window', '1m', '--stream']
+
+            with patch.object(sys, 'argv', argv):
+                with patch('builtins.print') as mock_print:
+                    result = main()
+
+        lines = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual((result.count, result.total), (4, 15.0))
+        self.assertEqual(lines, [
+            "[1970/01/01-00:00:00] ok_count=2 total_value=3.00 avg=1.50 window_end=1970/01/01-00:01:00",
+            "[1970/01/01-00:01:00] ok_count=1 total_value=4.00 avg=4.00 window_end=1970/01/01-00:02:00",
+            "[1970/01/01-00:03:00] ok_count=1 total_value=8.00 avg=8.00 window_end=1970/01/01-00:04:00",
+            "[2024/01/01-12:00:00] ok_count=4 total_value=15.00 avg=3.75",
+            "windows late=0 skipped=0"])
+
+    @patch('cli.main.settings')
+    @patch('cli.main.dt')
+    def test_streaming_paths_agree_on_leading_blank_line(self, mock_dt, mock_settings):
+        """Test plain, --top and --window runs count the same records of a CSV starting with a blank line."""
+        mock_dt.datetime.now.return_value.strftime.return_value = "2024/01/01-12:00:00"
+        mock_settings.snapshot.side_effect = Settings().snapshot
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "blank.csv"
+            data_path.write_text('\nok,1\nok,2\n', encoding='utf-8')
+            counts = []
+            for extra in ([], ['--top', '5'], ['--window', '1m']):
+                with patch.object(sys, 'argv', ['main.py', '--file', str(data_path), '--all'] + extra):
+                    with patch('builtins.print'):
+                        counts.append(main().count)
+
+        self.assertEqual(counts, [2, 2, 2])
+
+    @patch('cli.main.settings')
+    def test_streaming_paths_report_malformed_input(self, mock_settings):
+        """Test --max-memory, --top and --window exit with an error message on malformed input."""
+        mock_settings.snapshot.side_effect = Settings().snapshot
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "bad.json"
+            data_path.write_text('[{"status":"ok","value":1},', encoding='utf-8')
+            for extra in (['--max-memory', '64M'], ['--top', '1'], ['--window', '1m']):
+                with patch.object(sys, 'argv', ['main.py', '--file', str(data_path)] + extra):
+                    with patch('builtins.print'):
+                        with self.assertRaises(SystemExit) as raised:
+                            main()
+                self.assertIn("cannot parse", str(raised.exception.code))
+
+    def test_parse_arguments_validates_windows(self):
+        """Test window options need --window, a slide that divides it and no --top/--max-memory."""
+        for test_args in (['--stream'], ['--window', '1m', '--slide', '25s'], ['--window', '1m', '--top', '3'],
+                          ['--window', '1m', '--max-memory', '64M'], ['--top', '3', '--max-memory', '64M'],
+                          ['--delta-cache', 'cache.db', '--max-memory', '64M']):
+            with patch.object(sys, 'argv', ['main.py'] + test_args):
+                with patch('sys.stderr', new_callable=StringIO):
+                    with self.assertRaises(SystemExit):
+                        parse_arguments()
+
+    def test_parse_arguments_rejects_delta_cache_with_sampling(self):
+        """Test --delta-cache cannot be combined with sampling."""
+        with patch.object(sys, 'argv', ['main.py', '--delta-cache', 'cache.db', '--sample', '10']):
+            with patch('sys.stderr', new_callable=StringIO):
+                with self.assertRaises(SystemExit):
+                    parse_arguments()
+
     @patch('cli.main.DataLoader')
     @patch('cli.main.record_filter')
     @patch('cli.main.calculator')
@@ -65,10 +294,10 @@ class TestCLI(unittest.TestCase):
             with patch('builtins.print') as mock_print:
                 result = main()
                 
-                # Verify settings were updated
-                self.assertEqual(mock_settings.data_path, 'test.json')
-                self.assertEqual(mock_settings.default_threshold, 10)
-                self.assertEqual(mock_settings.filter_mode, 'ALL')
+                # Verify the run context was built from the arguments
+                mock_settings.snapshot.assert_called_once_with(
+                    data_path='test.json', default_threshold=10, filter_mode='ALL')
+                mock_loader_class.assert_called_once_with(mock_settings.snapshot.return_value)
                 
                 # Verify function calls
                 mock_loader.load_records.assert_called_once()
@@ -143,9 +372,8 @@ class TestCLI(unittest.TestCase):
             with patch('builtins.print') as mock_print:
                 result = main()
                 
-                # Verify only threshold was updated
-                self.assertEqual(mock_settings.default_threshold, 7.5)
-                # file and filter_mode should not be modified
+                # Verify only threshold was overridden
+                mock_settings.snapshot.assert_called_once_with(default_threshold=7.5)
                 
                 # Verify output
                 mock_print.assert_called_once_with("[2024/01/01-12:00:00] ok_count=3 total_value=75.50 avg=25.17")
@@ -0,0 +1,56 @@
+import json
+import random
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from config.settings import settings
+from core.calculator import calculator
+from core.filters import record_filter
+from data_io.data_loader import DataLoader
+
+
+def _analyze(context):
+    loader = DataLoader(context)
+    records = loader.load_records()
+    filtered = record_filter.filter_records(records, context=context)
+    return calculator.calculate_statistics(filtered)
+
+
+class TestConcurrentAnalyses(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [{"status": "ok" if i % 3 else "bad", "value": i} for i in range(2000)]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(self.data, f)
+            self.temp_path = Path(f.name)
+
+    def tearDown(self):
+        self.temp_path.unlink()
+
+    def _expected(self, context):
+        values = [item["value"] for item in self.data
+                  if context.filter_mode == "ALL" or
+                  (item["status"] == "ok" and item["value"] >= context.default_threshold)]
+        return len(values), float(sum(values))
+
+    def test_many_concurrent_analyses_with_different_contexts(self):
+        """Test analyses with different thresholds and modes do not interfere across threads."""
+        rng = random.Random(7)
+        base = settings.snapshot(data_path=self.temp_path)
+        contexts = [base.replace(default_threshold=rng.randint(0, 2000),
+                                 filter_mode=rng.choice(["OK", "ALL"]),
+                                 max_memory=rng.choice([None, 64 << 20]))
+                    for _ in range(200)]
+        global_state = dict(vars(settings))
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(_analyze, contexts))
+
+        for context, result in zip(contexts, results):
+            self.assertEqual((result.count, result.total), self._expected(context), context)
+        self.assertEqual(vars(settings), global_state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
 import unittest
 import json
+import random
 import tempfile
+from io import StringIO
 from pathlib import Path
 from unittest.mock import patch, mock_open
 from data_io.data_loader import DataLoader
-from models.records import Record
+from data_io.fast_parser import fast_parser
+from data_io.planner import ExecutionPlan, IN_MEMORY, STREAMING, SPILL
+from config.settings import Settings
+from models.records import Record, RecordColumns
 
 
 class TestDataLoader(unittest.TestCase):
@@ -72,13 +77,34 @@ class TestDataLoader(unittest.TestCase):
         
         test_data = [{"status": "ok", "value": 42}]
         
-        with patch("builtins.open", mock_open(read_data=json.dumps(test_data))):
+        # JSON arrays are read as bytes first, for the specialised parser
+        with patch("builtins.open", mock_open(read_data=json.dumps(test_data).encode('utf-8'))):
             records = self.loader.load_records()
             
             self.assertEqual(len(records), 1)
             self.assertEqual(records[0].status, "ok")
             self.assertEqual(records[0].value, 42)
 
+    def test_load_records_uses_fast_parser_with_json_values(self):
+        """Test the default JSON-array load goes through the fast parser and keeps json's values."""
+        text = '[{"status": "ok", "value": 10}, {"value": "2.5", "status": "bad"}, ' \
+               '{"status": "OK", "value": 1e2}, {"status": "ok", "value": null}]'
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            f.write(text)
+            temp_path = Path(f.name)
+
+        try:
+            with patch.object(fast_parser, 'parse_records', wraps=fast_parser.parse_records) as spy:
+                records = self.loader.load_records(temp_path)
+
+            spy.assert_called_once()
+            expected = self.loader._parse_records(json.loads(text))
+            self.assertEqual(records, expected)
+            self.assertEqual([type(record.value) for record in records],
+                             [type(record.value) for record in expected])
+        finally:
+            temp_path.unlink()
+
     def test_load_records_file_not_found_returns_fallback(self):
         """Test loading records returns fallback data when file not found."""
         non_existent_path = Path("non_existent_file.json")
@@ -131,6 +157,305 @@ class TestDataLoader(unittest.TestCase):
         self.assertEqual(records[3].status, "ok")
         self.assertIsNone(records[3].value)
 
+    def test_load_records_from_ndjson(self):
+        """Test loading records from a newline-delimited JSON file."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.ndjson', delete=False) as f:
+            f.write('{"status": "ok", "value": 10}\n\n{"STATUS": "bad", "value": "20"}\n')
+            temp_path = Path(f.name)
+
+        try:
+            records = self.loader.load_records(temp_path)
+
+            self.assertEqual(records, [Record(status="ok", value=10), Record(status="bad", value="20")])
+        finally:
+            temp_path.unlink()
+
+    def write_temp(self, text: str, suffix: str) -> Path:
+        with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False, newline='') as f:
+            f.write(text)
+        self.addCleanup(Path(f.name).unlink)
+        return Path(f.name)
+
+    def test_load_records_from_csv_with_header(self):
+        """Test CSV columns are found by header name, in any order."""
+        path = self.write_temp('id,value,STATUS\r\n1,10,ok\r\n2,"1,5",bad\r\n3,,OK\r\n4\r\n', '.csv')
+
+        records = self.loader.load_records(path)
+
+        self.assertEqual(records, [Record(status="ok", value="10"), Record(status="bad", value="1,5"),
+                                   Record(status="OK", value=""), Record(status="unknown", value=0)])
+
+    def test_csv_header_after_blank_lines(self):
+        """Test blank lines before the header do not hide it."""
+        path = self.write_temp('\n\nvalue,status\n5,ok\n7,ok\n', '.csv')
+
+        records = self.loader.load_records(path)
+
+        self.assertEqual(records, [Record(status="ok", value="5"), Record(status="ok", value="7")])
+
+    def test_iter_located_skips_leading_blank_lines(self):
+        """Test located CSV rows start at the first non-blank line, with or without a header."""
+        for text, first in (('\r\nok,1\nbad,2\n', 2), ('\n\nvalue,status\n5,ok\n', 15)):
+            path = self.write_temp(text, '.csv')
+
+            located = list(self.loader.iter_located(path))
+
+            self.assertEqual(located[0][0], first)
+            self.assertNotIn(Record(status="unknown", value=0), [record for _, record in located])
+            self.assertEqual(len(located), len(self.loader.load_records(path)))
+
+    def test_csv_header_prefers_lowercase_status(self):
+        """Test `status` wins over `STATUS` like it does for JSON keys."""
+        self.assertEqual(DataLoader._header_indexes(['STATUS', 'status', 'value']), (1, 2, None))
+        self.assertEqual(DataLoader._header_indexes([' STATUS ', 'x', 'timestamp']), (0, None, 2))
+        self.assertEqual(DataLoader._header_indexes(['ok', '10']), (None, None, None))
+
+    def test_load_records_from_headerless_tsv(self):
+        """Test files without a header are read as status then value."""
+        path = self.write_temp('ok\t10\nbad\t2.5\n\nOK\tx\n', '.tsv')
+
+        records = self.loader.load_records(path)
+
+        self.assertEqual(records, [Record(status="ok", value="10"), Record(status="bad", value="2.5"),
+                                   Record(status="OK", value="x")])
+
+    def test_csv_batches_and_columns(self):
+        """Test CSV decodes into columns and streamed batches."""
+        path = self.write_temp('status,value\n' + ''.join(f'ok,{i}\n' for i in range(250)), '.csv')
+        plan = ExecutionPlan(STREAMING, 250, 0, None, 100, 1 << 14)
+
+        columns = self.loader.load_columns(path)
+        batches = list(self.loader.iter_batches(path, plan))
+
+        self.assertEqual(columns.values.tolist(), [float(i) for i in range(250)])
+        self.assertEqual([len(batch) for batch in batches], [100, 100, 50])
+        self.assertEqual(batches[2][-1], Record(status="ok", value="249"))
+
+    def test_iter_located_and_read_raw_json(self):
+        """Test JSON record offsets point at the raw records, including non-ASCII ones."""
+        text = '[\n  {"status": "caf\u00e9", "value": 1},\n  {"status": "\\u2713", "value": "2"}, {"value": 3}\n]'
+        path = self.write_temp(text, '.json')
+
+        located = list(self.loader.iter_located(path, block_size=8))
+        raws = self.loader.read_raw([offset for offset, _ in located], path)
+
+        self.assertEqual([record for _, record in located], [
+            Record(status="caf\u00e9", value=1), Record(status="\u2713", value="2"),
+            Record(status="unknown", value=3)])
+        self.assertEqual(raws, ['{"status": "caf\u00e9", "value": 1}', '{"status": "\\u2713", "value": "2"}',
+                                '{"value": 3}'])
+
+    def test_iter_located_and_read_raw_lines(self):
+        """Test NDJSON and CSV offsets point at whole lines or rows."""
+        ndjson = self.write_temp('{"status": "ok", "value": 1}\n\n{"status": "bad", "value": 2}\n', '.ndjson')
+        delimited = self.write_temp('status,value\nok,1\n\n"multi\nline",2\n', '.csv')
+
+        for path, expected in ((ndjson, ['{"status": "ok", "value": 1}', '{"status": "bad", "value": 2}']),
+                               (delimited, ['ok,1', '"multi\nline",2'])):
+            located = list(self.loader.iter_located(path))
+            self.assertEqual(self.loader.read_raw([offset for offset, _ in located], path), expected)
+        self.assertEqual(located[1][1], Record(status="multi\nline", value="2"))
+
+    def test_iter_located_missing_file_yields_fallback(self):
+        """Test a missing file yields the fallback records without offsets."""
+        located = list(self.loader.iter_located(Path("missing.json")))
+
+        self.assertEqual(located, [(None, record) for record in self.loader._get_fallback_data()])
+
+    def test_records_keep_event_timestamps(self):
+        """Test timestamps are parsed from JSON keys and CSV headers when present."""
+        json_path = self.write_temp(json.dumps([
+            {"status": "ok", "value": 1, "timestamp": "2024-01-01T00:00:00Z"},
+            {"status": "ok", "value": 2, "TIMESTAMP": 1704067260},
+            {"status": "ok", "value": 3}]), '.json')
+        csv_path = self.write_temp('status,timestamp,value\nok,2024-01-01T00:00:00Z,1\nok,,2\n', '.csv')
+        plan = ExecutionPlan(STREAMING, 3, 0, None, 10, 1 << 14)
+
+        for path in (json_path, csv_path):
+            loaded = self.loader.load_records(path)
+            streamed = [record for batch in self.loader.iter_batches(path, plan) for record in batch]
+            located = [record for _, record in self.loader.iter_located(path)]
+            for records in (loaded, streamed, located):
+                self.assertEqual(records[0].timestamp, 1704067200.0)
+                self.assertIsNone(records[-1].timestamp)
+
+    def test_sample_records_from_json_uses_reservoir(self):
+        """Test sampling a JSON array returns a uniform sample with known population."""
+        test_data = [{"status": "ok", "value": i} for i in range(100)]
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            temp_path = Path(f.name)
+
+        try:
+            sample = self.loader.sample_records(fraction=0.1, file_path=temp_path, rng=random.Random(0))
+
+            self.assertEqual(len(sample.records), 10)
+            self.assertEqual(sample.population, 100)
+            self.assertEqual(sample.weights, [100.0] * 10)
+        finally:
+            temp_path.unlink()
+
+    def test_sample_records_streams_csv(self):
+        """Test CSV sampling streams rows into the reservoir instead of loading the file."""
+        path = self.write_temp('status,value\n' + ''.join(f'ok,{i}\n' for i in range(1000)), '.csv')
+
+        with patch.object(DataLoader, 'load_records', side_effect=AssertionError("full load")):
+            sample = self.loader.sample_records(fraction=0.05, file_path=path, rng=random.Random(1))
+
+        self.assertEqual(sample.population, 1000)
+        self.assertAlmostEqual(len(sample.records), 50, delta=2)
+        self.assertEqual(len(set(record.value for record in sample.records)), len(sample.records))
+        self.assertTrue(all(record.status == "ok" for record in sample.records))
+
+    def test_sample_records_falls_back_on_malformed_json(self):
+        """Test a malformed JSON array is sampled from the fallback data."""
+        path = self.write_temp('[{"status": "ok", "value": 1},', '.json')
+
+        sample = self.loader.sample_records(sample_size=5, file_path=path, rng=random.Random(2))
+
+        self.assertEqual(sorted(map(str, sample.records)), sorted(map(str, self.loader._get_fallback_data())))
+
+    def test_sample_records_from_ndjson_seeks(self):
+        """Test seek sampling weights lines by length so estimates stay unbiased."""
+        rng = random.Random(5)
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonl', delete=False) as f:
+            for i in range(2000):
+                padding = " " * rng.randint(0, 60)
+                f.write(json.dumps({"status": "ok", "value": i % 10, "note": padding}) + "\n")
+            temp_path = Path(f.name)
+
+        try:
+            sample = self.loader.sample_records(sample_size=3000, file_path=temp_path, rng=rng)
+
+            self.assertEqual(len(sample.records), 3000)
+            self.assertIsNone(sample.population)
+            self.assertTrue(all(record is not None for record in sample.records))
+            estimated = sum(sample.weights) / len(sample.weights)
+            self.assertAlmostEqual(estimated / 2000, 1.0, delta=0.05)
+        finally:
+            temp_path.unlink()
+
+    def test_line_at_returns_whole_line(self):
+        """Test locating the line around a byte offset."""
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(b'first\nsecond\nthird')
+            temp_path = Path(f.name)
+
+        try:
+            with open(temp_path, 'rb') as f:
+                self.assertEqual(self.loader._line_at(f, 0), b'first\n')
+                self.assertEqual(self.loader._line_at(f, 5), b'first\n')
+                self.assertEqual(self.loader._line_at(f, 9), b'second\n')
+                self.assertEqual(self.loader._line_at(f, 15), b'third')
+        finally:
+            temp_path.unlink()
+
+    def test_iter_json_array_matches_json_load(self):
+        """Test incremental decoding equals json.loads for any block size."""
+        text = json.dumps([{"status": "ok", "value": 12345}, {"status": 'b"a[d', "value": "1,2"},
+                           {"nested": {"k": [1, 2]}}, 7, -0.25e3, None, []], indent=1)
+
+        for block_size in (1, 2, 3, 7, 64, 4096):
+            items = list(DataLoader._iter_json_array(StringIO(text), block_size))
+            self.assertEqual(items, json.loads(text), block_size)
+
+    def test_iter_json_array_rejects_invalid_input(self):
+        """Test incremental decoding raises on malformed arrays."""
+        for text in ('', '{"status": "ok"}', '[1, 2', '[1 2]', '[1,]', '[1] x'):
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                list(DataLoader._iter_json_array(StringIO(text), 4))
+
+    def test_iter_batches_strategies_agree(self):
+        """Test in-memory, streaming and spill plans yield the same records in bounded batches."""
+        test_data = [{"status": "ok", "value": i} for i in range(25)] + [{"STATUS": "bad", "value": "x"}]
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            temp_path = Path(f.name)
+
+        try:
+            expected = [Record(status="ok", value=float(i)) for i in range(25)] + [Record(status="bad", value=None)]
+            for strategy in (IN_MEMORY, STREAMING, SPILL):
+                plan = ExecutionPlan(strategy, 26, 0, None, batch_size=10, block_size=16)
+                batches = list(self.loader.iter_batches(temp_path, plan))
+
+                self.assertEqual([len(batch) for batch in batches], [10, 10, 6], strategy)
+                records = [record for batch in batches for record in batch]
+                self.assertEqual([r.status for r in records], [r.status for r in expected])
+                self.assertEqual([r.get_numeric_value() for r in records],
+                                 [r.get_numeric_value() for r in expected])
+        finally:
+            temp_path.unlink()
+
+    def test_load_columns_fast_and_generic_paths_agree(self):
+        """Test columnar loading gives the same columns whether or not the fast parser applies."""
+        plain = [{"status": "ok", "value": 1}, {"value": "2", "status": "x"}, {"status": "bad", "value": None}]
+        expected = None
+        for extra in ({}, {"extra": True}):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+                json.dump([dict(item, **extra) for item in plain], f)
+                temp_path = Path(f.name)
+
+            try:
+                with patch.object(fast_parser, 'parse_columns', wraps=fast_parser.parse_columns) as spy:
+                    columns = self.loader.load_columns(temp_path)
+                    spy.assert_called_once()
+                records = list(columns)
+                if expected is None:
+                    expected = records
+                self.assertEqual(records, expected)
+            finally:
+                temp_path.unlink()
+
+        self.assertEqual(expected, [Record("ok", 1.0), Record("x", 2.0), Record("bad", None)])
+
+    def test_iter_batches_missing_file_returns_fallback(self):
+        """Test batch iteration of a missing file yields the fallback data."""
+        batches = list(self.loader.iter_batches(Path("non_existent_file.json")))
+
+        self.assertEqual(batches, [self.loader._get_fallback_data()])
+
+    @patch('data_io.data_loader.settings')
+    def test_load_records_with_memory_budget(self, mock_settings):
+        """Test a memory budget loads columns when they fit and spills otherwise."""
+        mock_settings.encoding = 'utf-8'
+        test_data = [{"status": "ok", "value": i} for i in range(1000)]
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            temp_path = Path(f.name)
+
+        try:
+            mock_settings.max_memory = 64 << 20
+            records = self.loader.load_records(temp_path)
+            self.assertIsInstance(records, RecordColumns)
+            self.assertEqual(len(records), 1000)
+            self.assertEqual(records[999], Record(status="ok", value=999.0))
+
+            with patch('data_io.planner.MemoryPlanner.COLUMN_BYTES', 1 << 20):
+                spilled = self.loader.load_records(temp_path)
+            with spilled:
+                self.assertEqual(len(spilled), 1000)
+                self.assertEqual(sum(r.get_numeric_value() for r in spilled), sum(range(1000)))
+                self.assertEqual(len(list(spilled)), 1000)  # iterable more than once
+            with self.assertRaises(ValueError):
+                list(spilled)  # the temporary file is gone after the block
+        finally:
+            temp_path.unlink()
+
+    def test_load_records_uses_context(self):
+        """Test a loader built with a context reads its path from the context."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([{"status": "ok", "value": 5}], f)
+            temp_path = Path(f.name)
+
+        try:
+            loader = DataLoader(Settings().snapshot(data_path=temp_path))
+            self.assertEqual(loader.load_records(), [Record(status="ok", value=5)])
+        finally:
+            temp_path.unlink()
+
     def test_get_fallback_data(self):
         """Test fallback data structure."""
         fallback_records = self.loader._get_fallback_data()
@@ -0,0 +1,121 @@
+import json
+import random
+import tempfile
+import unittest
+from contextlib import nullcontext
+from pathlib import Path
+from config.settings import Settings
+from core.delta import DeltaAnalyzer
+from data_io.chunk_store import ChunkStore
+from data_io.chunking import ContentChunker
+from models.records import AnalysisResult
+
+
+class TestDeltaAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_path = Path(self.tmp.name) / "data.json"
+        self.store = ChunkStore(Path(self.tmp.name) / "cache.db")
+        self.addCleanup(self.store.close)
+        rng = random.Random(7)
+        self.records = [{"status": rng.choice(["ok", "OK", "bad"]), "value": rng.randint(0, 50)}
+                        for _ in range(3000)]
+
+    def write(self, records, suffix='.json'):
+        path = self.data_path.with_suffix(suffix)
+        with open(path, 'w', encoding='utf-8') as f:
+            if suffix == '.json':
+                json.dump(records, f, indent=2)
+            else:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+        return path
+
+    def analyzer(self, **overrides):
+        context = Settings().snapshot(**overrides)
+        return DeltaAnalyzer(self.store, context, ContentChunker(avg_size=1024))
+
+    def expected(self, records, threshold=0):
+        values = [r["value"] for r in records if r["status"].lower() == "ok" and r["value"] >= threshold]
+        return len(values), float(sum(values))
+
+    def test_first_run_parses_every_chunk(self):
+        """Test a cold run computes the full result."""
+        result, stats = self.analyzer().analyze(self.write(self.records))
+
+        self.assertEqual((result.count, result.total), self.expected(self.records))
+        self.assertGreater(stats.chunks, 10)
+        self.assertEqual(stats.reused, 0)
+
+    def test_rerun_after_edit_reparses_only_changed_chunks(self):
+        """Test an in-place edit re-parses a few chunks and gives the new result."""
+        self.analyzer().analyze(self.write(self.records))
+        self.records[1500]["value"] = 1000
+        self.records[1501]["status"] = "bad"
+
+        result, stats = self.analyzer().analyze(self.write(self.records))
+
+        self.assertEqual((result.count, result.total), self.expected(self.records))
+        self.assertLessEqual(stats.chunks - stats.reused, 3)
+
+    def test_partials_keyed_by_settings(self):
+        """Test cached partials are not reused under a different threshold."""
+        path = self.write(self.records)
+        self.analyzer().analyze(path)
+        result, stats = self.analyzer(default_threshold=25).analyze(path)
+
+        self.assertEqual(stats.reused, 0)
+        self.assertEqual((result.count, result.total), self.expected(self.records, 25))
+
+    def test_ndjson(self):
+        """Test NDJSON files are chunked on lines."""
+        path = self.write(self.records, '.ndjson')
+        self.analyzer().analyze(path)
+        result, stats = self.analyzer().analyze(path)
+
+        self.assertEqual((result.count, result.total), self.expected(self.records))
+        self.assertEqual(stats.reused, stats.chunks)
+
+    def test_nested_records_reuse_chunks(self):
+        """Test records with nested objects and braces in strings are chunked and reused."""
+        for i, record in enumerate(self.records):
+            record["meta"] = {"k": i % 7, "note": "}, {"}
+        path = self.write(self.records)
+        self.analyzer().analyze(path)
+        result, stats = self.analyzer().analyze(path)
+
+        self.assertEqual((result.count, result.total), self.expected(self.records))
+        self.assertIsNone(stats.fallback)
+        self.assertGreater(stats.chunks, 10)
+        self.assertEqual(stats.reused, stats.chunks)
+
+    def test_invalid_file_falls_back_to_full_load(self):
+        """Test a malformed or missing file gives the loader's fallback result."""
+        self.data_path.write_text('[{"status": "ok", "value": 1},', encoding='utf-8')
+        for path in (self.data_path, Path(self.tmp.name) / "missing.json"):
+            with self.assertLogs('logger', 'WARNING') if path == self.data_path else nullcontext():
+                result, stats = self.analyzer().analyze(path)
+            self.assertEqual((result.count, result.total), (2, 10.0))
+            self.assertEqual(stats.chunks, 0)
+            self.assertIn("delta fallback=full-load", stats.format_summary())
+
+    def test_csv_reports_full_load(self):
+        """Test CSV input is analyzed in full and reported as such."""
+        path = self.data_path.with_suffix('.csv')
+        path.write_text("status,value\nok,3\nbad,4\n", encoding='utf-8')
+        result, stats = self.analyzer().analyze(path)
+
+        self.assertEqual((result.count, result.total), (1, 3.0))
+        self.assertEqual(stats.format_summary(), "delta fallback=full-load (csv input is not chunked)")
+
+    def test_store_round_trip(self):
+        """Test the store returns what was put under the same key only."""
+        self.store.put("abc", "OK|0", AnalysisResult(count=2, total=5.0, average=2.5))
+
+        self.assertEqual(self.store.get("abc", "OK|0"), AnalysisResult(count=2, total=5.0, average=2.5))
+        self.assertIsNone(self.store.get("abc", "ALL|0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
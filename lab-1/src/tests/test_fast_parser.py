@@ -0,0 +1,112 @@
+import json
+import math
+import random
+import unittest
+from io import BytesIO
+from data_io.data_loader import DataLoader
+from data_io.fast_parser import FastRecordParser
+from models.records import RecordColumns
+
+
+def _generic_columns(data: bytes) -> RecordColumns:
+    """Reference decoding through json.loads and the loader's field defaults."""
+    columns = RecordColumns()
+    for item in json.loads(data.decode('utf-8')):
+        columns.append(*DataLoader._fields(item))
+    return columns
+
+
+def _fuzz_value(rng: random.Random):
+    return rng.choice([
+        rng.randint(-1000, 1000),
+        rng.uniform(-1e6, 1e6),
+        rng.uniform(0, 1) * 10 ** rng.randint(-30, 30),
+        str(rng.randint(0, 100)),
+        str(round(rng.uniform(0, 100), 3)),
+        " 42 ", "1_000", "nan", "inf", "x", "", "-", "1e5", None, 0, -0.0
+    ])
+
+
+def _fuzz_status(rng: random.Random):
+    return rng.choice(["ok", "OK", "Ok ", "bad", "error", "", "café", "✓", "a b"])
+
+
+def _fuzz_document(rng: random.Random) -> bytes:
+    """Random array of records with random spacing, key order and occasional surprises."""
+    def ws():
+        return rng.choice(["", "", " ", "\n  ", "\t", "\r\n"])
+
+    parts = []
+    for _ in range(rng.randint(0, 40)):
+        fields = [f'"status"{ws()}:{ws()}{json.dumps(_fuzz_status(rng), ensure_ascii=rng.random() < 0.005)}',
+                  f'"value"{ws()}:{ws()}{json.dumps(_fuzz_value(rng))}']
+        surprise = rng.random()
+        if surprise < 0.003:
+            fields.append('"extra": 1')
+        elif surprise < 0.006:
+            fields[0] = '"STATUS": "ok"'
+        elif surprise < 0.008:
+            fields[1] = '"value": true'
+        elif surprise < 0.010:
+            fields[0] = '"status": "tab\\tbed"'
+        if rng.random() < 0.5:
+            fields.reverse()
+        parts.append(ws() + "{" + ws() + ("," + ws()).join(fields) + ws() + "}" + ws())
+    return (ws() + "[" + ",".join(parts) + "]" + ws()).encode('utf-8')
+
+
+class TestFastRecordParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = FastRecordParser()
+
+    def assertColumnsEqual(self, actual: RecordColumns, expected: RecordColumns):
+        self.assertEqual(actual.statuses, expected.statuses)
+        self.assertEqual(len(actual.values), len(expected.values))
+        for a, e in zip(actual.values, expected.values):
+            self.assertTrue(a == e or (math.isnan(a) and math.isnan(e)), (a, e))
+
+    def test_parse_simple_array(self):
+        """Test parsing a plain array of records in either key order."""
+        data = b'[{"status": "ok", "value": 10}, {"value": "2.5", "status": "OK"}, {"status": "bad", "value": null}]'
+        columns = self.parser.parse_columns(BytesIO(data))
+
+        self.assertEqual(columns.statuses, ["ok", "OK", "bad"])
+        self.assertEqual(columns.values[:2].tolist(), [10.0, 2.5])
+        self.assertTrue(math.isnan(columns.values[2]))
+
+    def test_parse_empty_array(self):
+        """Test an empty array gives empty columns."""
+        self.assertEqual(len(self.parser.parse_columns(BytesIO(b' [ ] \n'))), 0)
+
+    def test_unexpected_input_falls_back(self):
+        """Test unsupported shapes return None instead of guessing."""
+        for data in (b'', b'{}', b'[1]', b'[{"status": "ok"}]', b'[{"status": "o\\"k", "value": 1}]',
+                     b'[{"status": "ok", "value": 1}', b'[{"status": "ok", "value": 1}] x',
+                     b'[{"status": "ok", "value": 1},]', b'[{"status": "\xff", "value": 1}]',
+                     b'[{"status": "ok", "value": [1]}]'):
+            self.assertIsNone(self.parser.parse_columns(BytesIO(data)), data)
+
+    def test_differential_against_json(self):
+        """Test fuzzed documents decode exactly like json.loads, or fall back."""
+        rng = random.Random(1234)
+        parsed = 0
+        for _ in range(500):
+            data = _fuzz_document(rng)
+            block_size = rng.choice([1, 7, 64, 1 << 20])
+            columns = self.parser.parse_columns(BytesIO(data), block_size)
+            if columns is None:
+                continue
+            parsed += 1
+            self.assertColumnsEqual(columns, _generic_columns(data))
+            records = self.parser.parse_records(BytesIO(data), block_size)
+            expected = [DataLoader(None)._record(item) for item in json.loads(data.decode('utf-8'))]
+            self.assertEqual([(r.status, r.value, type(r.value)) for r in records],
+                             [(r.status, r.value, type(r.value)) for r in expected])
+
+        # Most fuzzed documents are in the supported shape.
+        self.assertGreater(parsed, 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch
 from core.filters import RecordFilter
 from models.records import Record
-from config.settings import Settings
+from config.settings import Settings, AnalysisContext
 
 
 class TestRecordFilter(unittest.TestCase):
@@ -71,6 +71,24 @@ class TestRecordFilter(unittest.TestCase):
         
         self.assertEqual(len(filtered), 2)  # Only values >= 12
 
+    @patch('core.filters.settings')
+    def test_filter_records_with_context_ignores_settings(self, mock_settings):
+        """Test an explicit context overrides the global settings."""
+        mock_settings.default_threshold = 100
+        mock_settings.filter_mode = "OK"
+        context = AnalysisContext(data_path="unused.json", default_threshold=12, filter_mode="ALL")
+
+        records = [
+            Record(status="ok", value=10),
+            Record(status="bad", value=15),
+            Record(status="ok", value=None)
+        ]
+
+        self.assertEqual(len(self.filter.filter_records(records, context=context)), 2)
+        self.assertEqual(len(self.filter.filter_records(records, threshold=12,
+                                                        context=context.replace(filter_mode="OK"))), 0)
+        self.assertTrue(self.filter.matches(records[1], context=context))
+
     def test_filter_records_with_invalid_values(self):
         """Test filtering excludes records with invalid numeric values."""
         records = [
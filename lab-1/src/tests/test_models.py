@@ -1,5 +1,6 @@
 import unittest
-from models.records import Record, AnalysisResult
+from models.records import (Record, AnalysisResult, SampledAnalysisResult, WindowedAnalysisResult,
+                            RecordColumns, to_timestamp)
 
 
 class TestRecord(unittest.TestCase):
@@ -56,6 +57,31 @@ class TestRecord(unittest.TestCase):
         self.assertFalse(record.is_valid(0))
 
 
+class TestTimestamps(unittest.TestCase):
+
+    def test_to_timestamp(self):
+        """Test epoch numbers and ISO-8601 strings convert to epoch seconds."""
+        self.assertEqual(to_timestamp(1700000000), 1700000000.0)
+        self.assertEqual(to_timestamp("1700000000.5"), 1700000000.5)
+        self.assertEqual(to_timestamp("2024-01-01T00:01:00Z"), 1704067260.0)
+        self.assertEqual(to_timestamp("2024-01-01 00:01:00"), 1704067260.0)
+        self.assertEqual(to_timestamp("2024-01-01T02:01:00+02:00"), 1704067260.0)
+        for value in (None, True, "yesterday", float("nan"), [1]):
+            self.assertIsNone(to_timestamp(value))
+
+    def test_record_timestamp_is_optional(self):
+        """Test records compare equal without a timestamp as before."""
+        self.assertEqual(Record(status="ok", value=1), Record(status="ok", value=1, timestamp=None))
+        self.assertNotEqual(Record(status="ok", value=1), Record(status="ok", value=1, timestamp=5.0))
+
+    def test_windowed_format_summary(self):
+        """Test window summaries are stamped with the window's start and end."""
+        result = WindowedAnalysisResult(count=2, total=3.0, average=1.5, start=1704067200.0, end=1704067260.0)
+
+        self.assertEqual(result.format_summary(),
+                         "[2024/01/01-00:00:00] ok_count=2 total_value=3.00 avg=1.50 window_end=2024/01/01-00:01:00")
+
+
 class TestAnalysisResult(unittest.TestCase):
     
     def test_format_summary(self):
@@ -72,6 +98,54 @@ class TestAnalysisResult(unittest.TestCase):
         expected = "[2024/01/01-12:00:00] ok_count=3 total_value=33.33 avg=11.11"
         self.assertEqual(result.format_summary(timestamp), expected)
 
+    def test_merge(self):
+        """Test merging results of disjoint record sets."""
+        merged = AnalysisResult(count=2, total=10.0, average=5.0).merge(
+            AnalysisResult(count=3, total=20.0, average=6.67))
+
+        self.assertEqual(merged, AnalysisResult(count=5, total=30.0, average=6.0))
+        self.assertEqual(AnalysisResult(0, 0.0, 0.0).merge(AnalysisResult(0, 0.0, 0.0)).average, 0.0)
+
+    def test_sampled_format_summary(self):
+        """Test sampled result formatting shows estimates with their intervals."""
+        result = SampledAnalysisResult(count=1234.4, total=5000.0, average=4.05,
+                                       count_margin=12.2, total_margin=80.5, average_margin=0.1,
+                                       sample_size=100, population=10000.0)
+        timestamp = "2024/01/01-12:00:00"
+        expected = ("[2024/01/01-12:00:00] ok_count=1234\u00b112 total_value=5000.00\u00b180.50 "
+                    "avg=4.05\u00b10.10 sample=100/10000 ci=95%")
+        self.assertEqual(result.format_summary(timestamp), expected)
+
+
+class TestRecordColumns(unittest.TestCase):
+
+    def test_append_converts_values(self):
+        """Test values are stored as numbers and non-numeric values read back as None."""
+        columns = RecordColumns()
+        for status, value in [("ok", 1), ("OK", "2.5"), ("bad", "x"), ("ok", None)]:
+            columns.append(status, value)
+
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(list(columns), [Record("ok", 1.0), Record("OK", 2.5),
+                                         Record("bad", None), Record("ok", None)])
+        self.assertEqual(columns[1], Record("OK", 2.5))
+
+    def test_statuses_are_shared(self):
+        """Test repeated statuses reuse one string object."""
+        columns = RecordColumns()
+        columns.append("".join(["o", "k"]), 1)
+        columns.append("".join(["o", "k"]), 2)
+
+        self.assertIs(columns.statuses[0], columns.statuses[1])
+
+    def test_batches(self):
+        """Test records are yielded in bounded batches."""
+        columns = RecordColumns()
+        for i in range(5):
+            columns.append("ok", i)
+
+        self.assertEqual([len(batch) for batch in columns.batches(2)], [2, 2, 1])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from config.settings import Settings
+from core.calculator import calculator
+from core.filters import record_filter
+from core.pipeline import Pipeline
+from core.sketches import RecordSketches
+from models.records import Record
+
+
+def _double(record: Record) -> Record:
+    return Record(status=record.status, value=record.get_numeric_value() * 2)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [Record(status=["ok", "bad", "OK"][i % 3], value=i % 17) for i in range(1000)]
+        self.context = Settings().snapshot(default_threshold=5)
+
+    def expected(self, records):
+        return calculator.calculate_statistics(record_filter.filter_records(records, context=self.context))
+
+    def test_filter_and_aggregate_match_eager_path(self):
+        """Test the lazy pipeline gives the same result as the eager singletons."""
+        result = Pipeline.from_records(self.records, self.context, batch_size=64).filter().aggregate()
+
+        self.assertEqual(result, self.expected(self.records))
+
+    def test_stages_are_lazy_and_batched(self):
+        """Test nothing is pulled from the source before the pipeline runs."""
+        pulled = []
+
+        def source():
+            for record in self.records:
+                pulled.append(record)
+                yield record
+
+        pipeline = Pipeline.from_records(source(), batch_size=100).map(_double)
+        self.assertEqual(pulled, [])
+
+        batches = pipeline.batches()
+        first = next(batches)
+        self.assertEqual(len(first), 100)
+        self.assertEqual(len(pulled), 100)
+        self.assertEqual(first[1].value, 2.0)
+
+    def test_builder_returns_new_pipelines(self):
+        """Test adding a stage leaves the original pipeline unchanged."""
+        base = Pipeline.from_records([])
+        filtered = base.filter()
+
+        self.assertEqual(base.stages, [])
+        self.assertEqual(len(filtered.stages), 1)
+
+    def test_custom_predicate_and_sink(self):
+        """Test custom predicates and sinks compose with the built-in stages."""
+        seen = []
+        Pipeline.from_records(self.records, batch_size=300) \
+            .filter(predicate=lambda record: record.status == "bad") \
+            .sink(seen.append)
+
+        self.assertEqual([len(batch) for batch in seen], [100, 100, 100, 33])
+
+    def test_thread_pool_keeps_order_and_bounds_queue(self):
+        """Test pooled stages preserve batch order and only pull queue_size batches ahead."""
+        pulled = []
+
+        def source():
+            for record in self.records:
+                pulled.append(record)
+                yield record
+
+        def slow(batch):
+            time.sleep(0.001)
+            return batch
+
+        batches = Pipeline.from_records(source(), batch_size=10) \
+            .map_batches(slow, workers=4, queue_size=3).batches()
+        first = next(batches)
+        self.assertLessEqual(len(pulled), 3 * 10)
+        rest = [record for batch in batches for record in batch]
+
+        self.assertEqual(first + rest, self.records)
+
+    def test_process_pool(self):
+        """Test stages can run in a process pool with picklable functions."""
+        result = Pipeline.from_records(self.records, self.context, batch_size=128) \
+            .filter(workers=2, processes=True) \
+            .map(_double, workers=2, processes=True) \
+            .aggregate()
+
+        expected = self.expected(self.records)
+        self.assertEqual((result.count, result.total), (expected.count, expected.total * 2))
+
+    def test_profile_before_filter_sees_all_records(self):
+        """Test a profile stage ahead of the filter feeds sketches every record."""
+        sketches = RecordSketches(heavy_hitters=3)
+        result = Pipeline.from_records(self.records, self.context, batch_size=64) \
+            .profile(sketches).filter().aggregate()
+
+        self.assertEqual(result, self.expected(self.records))
+        self.assertEqual(sketches.top_statuses.top(), [("ok", 334), ("bad", 333), ("OK", 333)])
+
+    def test_from_file_uses_batch_size(self):
+        """Test file sources decode in batches of the requested size."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([{"status": "ok", "value": i} for i in range(250)], f)
+            temp_path = Path(f.name)
+
+        try:
+            pipeline = Pipeline.from_file(temp_path, self.context, batch_size=100)
+            sizes = [len(batch) for batch in pipeline.batches()]
+            result = pipeline.filter().aggregate()
+
+            self.assertEqual(sizes, [100, 100, 50])
+            self.assertEqual((result.count, result.total), (245, float(sum(range(5, 250)))))
+        finally:
+            temp_path.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from config.settings import Settings
+from data_io.data_loader import DataLoader
+from data_io.planner import MemoryPlanner, IN_MEMORY, STREAMING, SPILL
+
+
+class TestMemoryPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = MemoryPlanner()
+        test_data = [{"status": "ok", "value": i} for i in range(5000)]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            self.temp_path = Path(f.name)
+
+    def tearDown(self):
+        self.temp_path.unlink()
+
+    def test_estimate_records(self):
+        """Test the record count is extrapolated from the head of the file."""
+        estimate = self.planner.estimate_records(self.temp_path)
+        self.assertAlmostEqual(estimate / 5000, 1.0, delta=0.1)
+
+    def test_estimate_records_counts_lines_for_csv(self):
+        """Test line-oriented formats are estimated by line count."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write('status,value\n' + 'ok,1\n' * 50000)
+            csv_path = Path(f.name)
+        try:
+            estimate = self.planner.estimate_records(csv_path, 'csv')
+            self.assertAlmostEqual(estimate / 50000, 1.0, delta=0.1)
+        finally:
+            csv_path.unlink()
+
+    def test_large_budget_plans_in_memory(self):
+        """Test a generous budget keeps the records in memory as columns."""
+        plan = self.planner.plan(self.temp_path, 64 << 20)
+
+        self.assertEqual(plan.strategy, IN_MEMORY)
+        self.assertLessEqual(plan.working_set, plan.budget)
+
+    def test_small_budget_streams(self):
+        """Test a budget below the columnar working set falls back to streaming."""
+        self.planner.RECORD_BYTES = 400
+        self.planner.COLUMN_BYTES = 1000
+        plan = self.planner.plan(self.temp_path, 1 << 20)
+
+        self.assertEqual(plan.strategy, STREAMING)
+        self.assertLessEqual(plan.working_set, plan.budget)
+        self.assertGreaterEqual(plan.batch_size, MemoryPlanner.MIN_BATCH_SIZE)
+
+    def test_small_budget_spills_when_materializing(self):
+        """Test callers that keep every record spill to disk instead of streaming."""
+        self.planner.COLUMN_BYTES = 1000
+        plan = self.planner.plan(self.temp_path, 1 << 20, materialize=True)
+
+        self.assertEqual(plan.strategy, SPILL)
+        self.assertLessEqual(plan.working_set, plan.budget)
+
+    def test_budget_below_minimum_raises(self):
+        """Test an unusably small budget raises ValueError."""
+        with self.assertRaises(ValueError):
+            self.planner.plan(self.temp_path, 1024)
+
+    def test_minimum_budget_is_the_smallest_accepted(self):
+        """Test minimum_budget plans and one byte less raises ValueError."""
+        minimum = self.planner.minimum_budget()
+        plan = self.planner.plan(self.temp_path, minimum)
+
+        self.assertEqual(plan.batch_size, MemoryPlanner.MIN_BATCH_SIZE)
+        with self.assertRaises(ValueError):
+            self.planner.plan(self.temp_path, minimum - 1)
+
+    def test_no_budget_streams_with_defaults(self):
+        """Test planning without a budget uses the default streaming batches."""
+        plan = self.planner.plan(self.temp_path, None)
+
+        self.assertEqual(plan.strategy, STREAMING)
+        self.assertEqual(plan.batch_size, MemoryPlanner.DEFAULT_BATCH_SIZE)
+        self.assertIn("budget=none", plan.format_summary())
+
+
+class TestPlannedMemory(unittest.TestCase):
+
+    def setUp(self):
+        test_data = [{"status": ["ok", "bad", "OK"][i % 3], "value": i * 0.37,
+                      "timestamp": "2024-01-01T00:00:00Z"} for i in range(10000)]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            self.temp_path = Path(f.name)
+
+    def tearDown(self):
+        self.temp_path.unlink()
+
+    def test_iter_batches_peak_stays_within_budget(self):
+        """Test the traced peak of a planned run never exceeds the budget."""
+        for budget in (1 << 20, 4 << 20, 16 << 20):
+            loader = DataLoader(Settings().snapshot(data_path=str(self.temp_path), max_memory=budget))
+            plan = loader.plan()
+            tracemalloc.start()
+            try:
+                count = 0
+                # Hold each batch while the next is decoded, as callers do
+                for batch in loader.iter_batches(plan=plan):
+                    count += len(batch)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            self.assertEqual(count, 10000)
+            self.assertLessEqual(peak, budget, plan.format_summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
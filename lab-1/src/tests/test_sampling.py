@@ -0,0 +1,111 @@
+import random
+import unittest
+from core.sampling import ReservoirSampler, estimate_statistics, sample_size_for
+from models.records import Record, RecordSample
+
+
+def _is_ok(record):
+    return record.is_valid(0)
+
+
+class TestReservoirSampler(unittest.TestCase):
+
+    def test_keeps_everything_when_stream_is_small(self):
+        """Test the reservoir holds the whole stream when it is shorter than the sample."""
+        sampler = ReservoirSampler(10, random.Random(1))
+        sampler.extend(range(4))
+
+        self.assertEqual(sampler.items, [0, 1, 2, 3])
+        self.assertEqual(sampler.seen, 4)
+
+    def test_sample_size_is_fixed(self):
+        """Test the reservoir never grows beyond its size."""
+        sampler = ReservoirSampler(50, random.Random(2))
+        sampler.extend(range(100000))
+
+        self.assertEqual(len(sampler.items), 50)
+        self.assertEqual(sampler.seen, 100000)
+        self.assertEqual(len(set(sampler.items)), 50)
+
+    def test_sample_is_uniform(self):
+        """Test every position of the stream is selected with roughly equal probability."""
+        rng = random.Random(3)
+        hits = [0] * 20
+        for _ in range(4000):
+            sampler = ReservoirSampler(5, rng)
+            sampler.extend(range(20))
+            for item in sampler.items:
+                hits[item] += 1
+
+        expected = 4000 * 5 / 20
+        for count in hits:
+            self.assertAlmostEqual(count / expected, 1.0, delta=0.1)
+
+    def test_rejects_empty_reservoir(self):
+        """Test a sample size below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            ReservoirSampler(0)
+
+
+class TestEstimateStatistics(unittest.TestCase):
+
+    def test_full_sample_is_exact(self):
+        """Test sampling the whole population gives exact values and zero margins."""
+        records = [Record(status="ok", value=10), Record(status="bad", value=5),
+                   Record(status="ok", value=30)]
+        sampler = ReservoirSampler(10)
+        sampler.extend(records)
+        result = estimate_statistics(sampler.to_sample(), _is_ok)
+
+        self.assertEqual(result.count, 2)
+        self.assertEqual(result.total, 40.0)
+        self.assertEqual(result.average, 20.0)
+        self.assertEqual(result.count_margin, 0.0)
+        self.assertEqual(result.total_margin, 0.0)
+        self.assertEqual(result.population, 3)
+
+    def test_interval_covers_true_values(self):
+        """Test the 95% intervals cover the exact statistics for a large population."""
+        rng = random.Random(4)
+        records = [Record(status=rng.choice(["ok", "bad"]), value=rng.uniform(0, 100))
+                   for _ in range(20000)]
+        exact = [r.get_numeric_value() for r in records if _is_ok(r)]
+        sampler = ReservoirSampler(2000, rng)
+        sampler.extend(records)
+        result = estimate_statistics(sampler.to_sample(), _is_ok)
+
+        self.assertLessEqual(abs(result.count - len(exact)), result.count_margin)
+        self.assertLessEqual(abs(result.total - sum(exact)), result.total_margin)
+        self.assertLessEqual(abs(result.average - sum(exact) / len(exact)), result.average_margin)
+
+    def test_weighted_draws(self):
+        """Test weighted draws expand to population estimates and skip empty draws."""
+        sample = RecordSample(records=[Record(status="ok", value=4), None],
+                              weights=[10.0, 30.0])
+        result = estimate_statistics(sample, _is_ok)
+
+        self.assertEqual(result.population, 5.0)
+        self.assertEqual(result.count, 5.0)
+        self.assertEqual(result.total, 20.0)
+        self.assertEqual(result.average, 4.0)
+
+    def test_empty_sample(self):
+        """Test an empty sample returns zero estimates."""
+        result = estimate_statistics(RecordSample(records=[], weights=[]), _is_ok)
+        self.assertEqual(result.count, 0)
+
+    def test_unsupported_confidence(self):
+        """Test unsupported confidence levels raise ValueError."""
+        with self.assertRaises(ValueError):
+            estimate_statistics(RecordSample(records=[], weights=[]), _is_ok, confidence=0.5)
+
+    def test_sample_size_for_fraction(self):
+        """Test sample fractions are translated to draw counts."""
+        self.assertEqual(sample_size_for(0.1, 1000), 100)
+        self.assertEqual(sample_size_for(0.001, 10), 1)
+        with self.assertRaises(ValueError):
+            sample_size_for(1.5, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
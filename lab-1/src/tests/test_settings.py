@@ -0,0 +1,62 @@
+import dataclasses
+import unittest
+from pathlib import Path
+from config.settings import AnalysisContext, Settings, parse_duration, parse_memory_size
+
+
+class TestSettings(unittest.TestCase):
+
+    def test_parse_memory_size(self):
+        """Test memory sizes with and without units."""
+        self.assertEqual(parse_memory_size("1048576"), 1 << 20)
+        self.assertEqual(parse_memory_size("512K"), 512 << 10)
+        self.assertEqual(parse_memory_size("2G"), 2 << 30)
+        self.assertEqual(parse_memory_size("1.5MB"), 3 << 19)
+        self.assertEqual(parse_memory_size("64mib"), 64 << 20)
+
+    def test_parse_memory_size_invalid(self):
+        """Test invalid memory sizes raise ValueError."""
+        with self.assertRaises(ValueError):
+            parse_memory_size("lots")
+
+    def test_parse_duration(self):
+        """Test durations with and without units, and invalid input."""
+        self.assertEqual(parse_duration("90"), 90.0)
+        self.assertEqual(parse_duration("15s"), 15.0)
+        self.assertEqual(parse_duration("1.5m"), 90.0)
+        self.assertEqual(parse_duration("2H"), 7200.0)
+        self.assertEqual(parse_duration("1d"), 86400.0)
+        with self.assertRaises(ValueError):
+            parse_duration("soon")
+
+    def test_update_from_args_max_memory(self):
+        """Test the memory budget can be set from arguments."""
+        settings = Settings()
+        self.assertIsNone(settings.max_memory)
+
+        settings.update_from_args({'max_memory': '256M'})
+        self.assertEqual(settings.max_memory, 256 << 20)
+
+    def test_snapshot_copies_settings(self):
+        """Test snapshots capture current settings and apply overrides."""
+        settings = Settings()
+        settings.default_threshold = 5
+        context = settings.snapshot(data_path="other.json", filter_mode="ALL")
+
+        self.assertEqual(context, AnalysisContext(data_path=Path("other.json"), default_threshold=5,
+                                                  filter_mode="ALL"))
+        settings.default_threshold = 9
+        self.assertEqual(context.default_threshold, 5)
+
+    def test_context_is_immutable(self):
+        """Test contexts cannot be modified in place, only replaced."""
+        context = Settings().snapshot()
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            context.default_threshold = 3
+        self.assertEqual(context.replace(default_threshold=3).default_threshold, 3)
+        self.assertEqual(context.default_threshold, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import random
+import unittest
+from config.settings import Settings
+from core.sketches import HyperLogLog, SpaceSaving, RecordSketches
+from core.topk import TopRecords, aggregate_with_top
+from models.records import Record
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_count_small_cardinality_is_exact(self):
+        """Test small cardinalities are counted (almost) exactly via linear counting."""
+        hll = HyperLogLog()
+        for i in range(100):
+            hll.add(i)
+            hll.add(i)  # duplicates must not be counted twice
+
+        self.assertEqual(hll.count(), 100)
+
+    def test_count_large_cardinality_within_error(self):
+        """Test estimates stay within a few percent for large cardinalities."""
+        hll = HyperLogLog(precision=12)
+        for i in range(50000):
+            hll.add(f"value-{i}")
+
+        self.assertAlmostEqual(hll.count() / 50000, 1.0, delta=0.06)
+
+    def test_merge_matches_single_sketch(self):
+        """Test merging worker sketches equals feeding a single sketch."""
+        whole, left, right = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        for i in range(3000):
+            whole.add(i)
+            (left if i % 2 else right).add(i)
+        left.merge(right)
+
+        self.assertEqual(left.count(), whole.count())
+
+    def test_merge_rejects_different_precision(self):
+        """Test merging sketches of different precision raises ValueError."""
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    def test_distinguishes_value_types(self):
+        """Test 10 and "10" are counted as distinct spellings."""
+        hll = HyperLogLog()
+        hll.add(10)
+        hll.add("10")
+        self.assertEqual(hll.count(), 2)
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_top_with_few_items_is_exact(self):
+        """Test counts are exact while fewer items than capacity are seen."""
+        tracker = SpaceSaving(capacity=5)
+        for status in ["ok", "ok", "bad", "ok", "Ok "]:
+            tracker.add(status)
+
+        self.assertEqual(tracker.top(), [("ok", 3), ("bad", 1), ("Ok ", 1)])
+        self.assertEqual(tracker.error("ok"), 0)
+
+    def test_heavy_hitter_survives_eviction(self):
+        """Test a frequent item stays tracked among many rare ones."""
+        tracker = SpaceSaving(capacity=3)
+        for i in range(1000):
+            tracker.add("ok")
+            tracker.add(f"rare-{i}")
+
+        item, count = tracker.top(1)[0]
+        self.assertEqual(item, "ok")
+        self.assertGreaterEqual(count, 1000)
+        self.assertEqual(len(tracker.top()), 3)
+
+    def test_merge_keeps_capacity_and_heavy_hitters(self):
+        """Test merged trackers keep the global heavy hitter within capacity."""
+        left, right = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+        for _ in range(10):
+            left.add("ok")
+            right.add("ok")
+        left.add("bad")
+        right.add("error")
+        left.merge(right)
+
+        self.assertEqual(left.top(1), [("ok", 20)])
+        self.assertEqual(len(left.top()), 2)
+
+
+class TestRecordSketches(unittest.TestCase):
+
+    def test_update_sees_every_record(self):
+        """Test sketches count records the filter and calculator would drop."""
+        records = [
+            Record(status="ok", value=10),
+            Record(status="OK", value=10),
+            Record(status="Ok ", value="x"),
+            Record(status="ok", value=20)
+        ]
+        sketches = RecordSketches(heavy_hitters=3)
+        sketches.update(records)
+
+        self.assertEqual(sketches.distinct_values.count(), 3)
+        self.assertEqual(sketches.distinct_statuses.count(), 3)
+        self.assertEqual(sketches.top_statuses.top(1), [("ok", 2)])
+
+    def test_distinct_values_compare_numerically(self):
+        """Test the same number spelled as int, float or string counts once."""
+        sketches = RecordSketches()
+        sketches.update([Record(status="ok", value=86), Record(status="ok", value=86.0),
+                         Record(status="ok", value="86"), Record(status="ok", value="n/a")])
+
+        self.assertEqual(sketches.distinct_values.count(), 2)
+
+    def test_aggregate_with_top_feeds_sketches_before_filtering(self):
+        """Test the one-pass top-k loop profiles records the filter rejects."""
+        records = [Record(status="ok", value=10), Record(status="Ok ", value=50),
+                   Record(status="bad", value=None)]
+        sketches = RecordSketches(heavy_hitters=3)
+        result = aggregate_with_top(((None, record) for record in records), TopRecords(1),
+                                    Settings().snapshot(), sketches)
+
+        self.assertEqual(result.count, 1)
+        self.assertEqual(sketches.distinct_statuses.count(), 3)
+
+    def test_long_tail_does_not_inflate_reported_hitters(self):
+        """Test rare one-off spellings do not pile onto the last reported status."""
+        statuses = ["ok"] * 6000 + ["bad"] * 3000 + ["err"] * 800 + [f"rare{i}" for i in range(1000)]
+        random.Random(8).shuffle(statuses)
+        sketches = RecordSketches(heavy_hitters=3)
+        sketches.update(Record(status=status, value=1) for status in statuses)
+
+        top = sketches.top_statuses.top(3)
+        self.assertEqual([status for status, _ in top], ["ok", "bad", "err"])
+        for (status, count), exact in zip(top, (6000, 3000, 800)):
+            self.assertLessEqual(count - sketches.top_statuses.error(status), exact)
+            self.assertGreaterEqual(count, exact)
+        self.assertLess(top[2][1], 1000)
+        self.assertRegex(sketches.format_summary(top=3), r"'err'=\d+(±\d+)?$")
+
+    def test_format_summary(self):
+        """Test sketch summary formatting."""
+        sketches = RecordSketches(heavy_hitters=2)
+        sketches.add(Record(status="ok", value=1))
+        sketches.add(Record(status="ok", value=2))
+
+        self.assertEqual(sketches.format_summary(), "distinct_values~2 distinct_statuses~1")
+        self.assertEqual(sketches.format_summary(top=2),
+                         "distinct_values~2 distinct_statuses~1\ntop_statuses: 'ok'=2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from config.settings import Settings
+from core.calculator import calculator
+from core.filters import record_filter
+from core.topk import TopRecords, aggregate_with_top, format_top
+from data_io.offset_index import TopIndex
+from models.records import AnalysisResult, Record
+
+
+class TestTopRecords(unittest.TestCase):
+
+    def test_keeps_k_largest(self):
+        """Test the heap keeps the k largest values in descending order."""
+        rng = random.Random(3)
+        values = [rng.uniform(-100, 100) for _ in range(1000)]
+        top = TopRecords(5)
+        for offset, value in enumerate(values):
+            top.add(Record(status="ok", value=value), offset)
+
+        self.assertEqual(len(top), 5)
+        self.assertEqual([value for value, _, _ in top.entries()], sorted(values, reverse=True)[:5])
+        for value, offset, record in top.entries():
+            self.assertEqual(values[offset], value)
+            self.assertEqual(record.value, value)
+
+    def test_ties_keep_first_seen_and_skip_non_numeric(self):
+        """Test equal values keep the earliest records and non-numeric values are ignored."""
+        top = TopRecords(2)
+        for offset, value in enumerate([5, "x", 5, None, 5]):
+            top.add(Record(status="ok", value=value), offset)
+
+        self.assertEqual([offset for _, offset, _ in top.entries()], [0, 2])
+
+    def test_invalid_k(self):
+        """Test k below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            TopRecords(0)
+
+    def test_aggregate_with_top_matches_eager_path(self):
+        """Test the single pass gives the usual result and only offers qualifying records."""
+        context = Settings().snapshot(default_threshold=10)
+        records = [Record(status=["ok", "bad"][i % 2], value=i % 37) for i in range(500)]
+        top = TopRecords(3)
+
+        result = aggregate_with_top(enumerate(records), top, context, batch_size=50)
+
+        expected = calculator.calculate_statistics(record_filter.filter_records(records, context=context))
+        self.assertEqual(result, expected)
+        self.assertTrue(all(record.status == "ok" for _, _, record in top.entries()))
+        self.assertEqual([value for value, _, _ in top.entries()], [36.0, 36.0, 36.0])
+
+    def test_format_top(self):
+        """Test one line is produced per entry with rank, value, offset and raw text."""
+        lines = format_top([(9.5, 12), (1.0, None)], ['{"value": 9.5}', 'Record(...)'])
+
+        self.assertEqual(lines, ['top[1] value=9.50 offset=12 {"value": 9.5}',
+                                 'top[2] value=1.00 offset=- Record(...)'])
+
+
+class TestTopIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_path = Path(self.tmp.name) / "data.json"
+        self.data_path.write_text(json.dumps([{"status": "ok", "value": 1}]), encoding='utf-8')
+        self.index = TopIndex(Path(self.tmp.name) / "index.json")
+        self.result = AnalysisResult(count=3, total=6.0, average=2.0)
+
+    def test_round_trip_and_smaller_k(self):
+        """Test stored entries are returned for the same or a smaller k."""
+        self.index.store(self.data_path, "OK|0|utf-8", 3, self.result, [(3.0, 30), (2.0, 20), (1.0, 10)])
+
+        self.assertEqual(self.index.lookup(self.data_path, "OK|0|utf-8", 2), (self.result, [(3.0, 30), (2.0, 20)]))
+        self.assertIsNone(self.index.lookup(self.data_path, "OK|0|utf-8", 4))
+        self.assertIsNone(self.index.lookup(self.data_path, "ALL|0|utf-8", 2))
+
+    def test_changed_file_invalidates_entry(self):
+        """Test an entry is ignored once the file's size or mtime changes."""
+        self.index.store(self.data_path, "OK|0|utf-8", 1, self.result, [(1.0, 1)])
+        stat = self.data_path.stat()
+        os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        self.assertIsNone(self.index.lookup(self.data_path, "OK|0|utf-8", 1))
+
+
+if __name__ == '__main__':
+    unittest.main()